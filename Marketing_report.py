@@ -1,20 +1,39 @@
 import os
-import re
-import pandas as pd
+import logging
 from openai import OpenAI
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, JavascriptException
 from dotenv import load_dotenv
-from collections import defaultdict
 from datetime import datetime
-from docx import Document
 import time
+from llm_engine import RateLimiter
+from llm_batch import build_requests, read_batch_job, run_packed_chat_completions, write_batch_job
+from llm_cache import LLMCache
+from llm_chunking import run_chunked_chat_completions, token_report
+from llm_structured import output_report, run_structured_chat_completions
+from sentiment_lexicon import LexiconSentiment, local_result
+from article_fetcher import ArticleFetcher
+from list_page import go_to_page, page_date_range, parse_list_date, seek_page, snapshot_list_page
+from article_extractor import extract_article, record_timing, timing_summary
+from crawler_pool import CrawlerPool, build_jobs, copy_session
+from crawl_state import CrawlState, post_key
+from pipeline import ReportAggregator, StreamingPipeline
+from corpus_store import CorpusStore, aggregate, report_posts
+from product_catalog import load_catalog
+from docx_report import write_summary_report
+from browser_session import NaverSession, cached_driver_path
+from browser_profile import block_resources, browser_rss, configure_lean, page_load_summary, record_page_load
+from waits import cafe_frame_url, list_signature, timed_wait, wait_for_cafe_frame, wait_for_list_change, wait_for_login, wait_for_network_idle, wait_summary
+from near_duplicates import NearDuplicateIndex, group_near_duplicates
+from driver_manager import ManagedDriver, article_done, recycle_if_needed, started_drivers
+from metrics import configure_logging, count_llm_results, incr, instrument_driver, run_main, span, timed
+
+logger = logging.getLogger("Marketing_report")
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,22 +43,145 @@ naver_marketing_id = os.getenv("NAVER_MARKETING_ID")
 naver_marketing_password = os.getenv("NAVER_MARKETING_PASSWORD")
 OpenAI.api_key = os.getenv("OPENAI_API_KEY")
 
+# LLM concurrency and rate budgets (0 disables a budget)
+llm_max_workers = int(os.getenv("LLM_MAX_WORKERS", "8"))
+llm_requests_per_minute = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+llm_tokens_per_minute = int(os.getenv("LLM_TOKENS_PER_MINUTE", "450000"))
+
+# On-disk cache of LLM summaries, so reruns only pay for new or edited posts
+llm_cache_path = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+llm_cache_max_age_days = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "90"))
+
+# LLM request mode: "online" (one request per post), "packed" (many short posts per request),
+# "batch-write" (write a Batch API input file after scraping) or "batch-ingest" (report from its output)
+llm_mode = os.getenv("LLM_MODE", "online")
+llm_batch_path = os.getenv("LLM_BATCH_PATH", "batch_input.jsonl")
+llm_batch_output_path = os.getenv("LLM_BATCH_OUTPUT_PATH", "batch_output.jsonl")
+llm_batch_packed = os.getenv("LLM_BATCH_PACKED", "0") == "1"
+
+# Posts over LLM_MAX_INPUT_TOKENS are split into LLM_CHUNK_TOKENS chunks that are summarized in
+# parallel (at most LLM_CHUNK_SUMMARY_TOKENS each) and then analyzed together
+llm_max_input_tokens = int(os.getenv("LLM_MAX_INPUT_TOKENS", "8000"))
+llm_chunk_tokens = int(os.getenv("LLM_CHUNK_TOKENS", "4000"))
+llm_chunk_summary_tokens = int(os.getenv("LLM_CHUNK_SUMMARY_TOKENS", "512"))
+
+# Sentiment: "llm" takes it from GPT-4o only, "local" classifies posts with the Korean lexicon
+# first and sends GPT-4o only posts below SENTIMENT_CONFIDENCE (or with under SENTIMENT_MIN_HITS expressions)
+sentiment_mode = os.getenv("SENTIMENT_MODE", "llm")
+sentiment_confidence = float(os.getenv("SENTIMENT_CONFIDENCE", "0.8"))
+sentiment_min_hits = int(os.getenv("SENTIMENT_MIN_HITS", "3"))
+sentiment_classifier = LexiconSentiment(sentiment_confidence, sentiment_min_hits) if sentiment_mode == "local" else None
+
+# LLM answers: "prose" is the free-form analysis, "json" a schema-validated JSON object per post
+# (sentiment, short summary, products) within LLM_JSON_MAX_TOKENS, re-requested up to LLM_JSON_MAX_ATTEMPTS times
+llm_output = os.getenv("LLM_OUTPUT", "prose")
+llm_json_max_tokens = int(os.getenv("LLM_JSON_MAX_TOKENS", "256"))
+llm_json_max_attempts = int(os.getenv("LLM_JSON_MAX_ATTEMPTS", "3"))
+
+# "browser" opens every post in Chrome, "http" reads post bodies and comments from the article API
+article_fetch_mode = os.getenv("ARTICLE_FETCH_MODE", "browser")
+
+# "script" reads an opened post (body and every comment page) in one script call, "legacy" element by element
+article_extract_mode = os.getenv("ARTICLE_EXTRACT_MODE", "script")
+max_comment_pages = int(os.getenv("MAX_COMMENT_PAGES", "10"))
+
+# Crawler pool: browsers crawling at once, jobs allowed per cafe at once, pages per job (0 = whole range)
+crawler_workers = int(os.getenv("CRAWLER_WORKERS", "1"))
+crawler_per_cafe_limit = int(os.getenv("CRAWLER_PER_CAFE_LIMIT", "2"))
+crawler_pages_per_job = int(os.getenv("CRAWLER_PAGES_PER_JOB", "0"))
+
+# Crawl state for resuming interrupted crawls and skipping unchanged posts (empty disables it)
+crawl_state_path = os.getenv("CRAWL_STATE_PATH", "crawl_state.sqlite3")
+
+# Pipeline: "batch" scrapes everything before analyzing it, "streaming" analyzes posts while
+# scraping, holding at most PIPELINE_MAX_PENDING posts and checkpointing the report as it goes
+pipeline_mode = os.getenv("PIPELINE_MODE", "batch")
+pipeline_max_pending = int(os.getenv("PIPELINE_MAX_PENDING", "64"))
+pipeline_checkpoint_path = os.getenv("PIPELINE_CHECKPOINT_PATH", "partial_report.json")
+
+# Near-duplicate posts (reposts, copies found under several keywords or cafes): posts whose Combined text
+# is at least NEAR_DUPLICATE_THRESHOLD similar (estimated Jaccard similarity of character shingles) are
+# analyzed and counted once, and the report gives each group's size (0 disables)
+near_duplicate_threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Waits: seconds to wait for a page to react, for late requests (comments) to settle after the
+# body appears (with NETWORK_IDLE_MS of network quiet), and for the login and any CAPTCHA
+wait_timeout = float(os.getenv("WAIT_TIMEOUT", "10"))
+network_idle_ms = int(os.getenv("NETWORK_IDLE_MS", "500"))
+network_idle_timeout = float(os.getenv("NETWORK_IDLE_TIMEOUT", "2"))
+login_timeout = float(os.getenv("LOGIN_TIMEOUT", "120"))
+
+# Session reuse: saved Naver cookies (empty disables), an optional Chrome profile directory for the
+# main browser, and the file caching the chromedriver path resolved by ChromeDriverManager
+naver_session_path = os.getenv("NAVER_SESSION_PATH", "naver_session.json")
+chrome_profile_dir = os.getenv("CHROME_PROFILE_DIR", "")
+chromedriver_cache_path = os.getenv("CHROMEDRIVER_CACHE_PATH", ".chromedriver_path")
+naver_session = NaverSession(naver_session_path, chrome_profile_dir or None)
+
+# Browser: "full" renders pages like a desktop browser, "lean" runs headless with a fixed
+# LEAN_WINDOW_SIZE viewport, a LEAN_CACHE_MB disk cache and images, media, fonts and ad scripts blocked
+browser_mode = os.getenv("BROWSER_MODE", "full")
+lean_window_size = tuple(int(size) for size in os.getenv("LEAN_WINDOW_SIZE", "1280,900").split(","))
+lean_cache_mb = int(os.getenv("LEAN_CACHE_MB", "64"))
+
+# Browser lifecycle: Chrome starts on first use, not at import, and a browser is restarted (keeping its
+# cookies) between result pages once it has opened BROWSER_RECYCLE_ARTICLES posts or its processes use
+# more than BROWSER_RECYCLE_RSS_MB (0 disables either limit)
+browser_recycle_articles = int(os.getenv("BROWSER_RECYCLE_ARTICLES", "500"))
+browser_recycle_rss_mb = int(os.getenv("BROWSER_RECYCLE_RSS_MB", "2048"))
+
+# Corpus store: every analyzed post (text, comments, replies, summary, sentiment, products) is kept
+# in a Parquet dataset partitioned by cafe and month (empty disables it). REPORT_SOURCE=store writes
+# the report from it for REPORT_START_DATE..REPORT_END_DATE (and REPORT_CAFES) without crawling
+corpus_store_path = os.getenv("CORPUS_STORE_PATH", "corpus")
+report_source = os.getenv("REPORT_SOURCE", "crawl")
+report_start_date = os.getenv("REPORT_START_DATE", "")
+report_end_date = os.getenv("REPORT_END_DATE", "")
+report_cafes = [cafe.strip() for cafe in os.getenv("REPORT_CAFES", "").split(",") if cafe.strip()]
+
+# Report files: REPORT_MAX_POSTS_PER_FILE splits the detailed summaries over several DOCX files
+# (0 keeps one file), REPORT_COMPANIONS also writes "csv" and/or "html" copies next to it
+report_max_posts_per_file = int(os.getenv("REPORT_MAX_POSTS_PER_FILE", "0"))
+report_companions = [kind.strip() for kind in os.getenv("REPORT_COMPANIONS", "").split(",") if kind.strip()]
+
+# Run metrics: spans and counters written to METRICS_PATH when the run ends (".prom" for Prometheus
+# text, JSON otherwise; empty disables), cProfile stats to PROFILE_PATH, console messages from LOG_LEVEL up
+metrics_path = os.getenv("METRICS_PATH", "run_metrics.json")
+profile_path = os.getenv("PROFILE_PATH", "")
+log_level = os.getenv("LOG_LEVEL", "INFO")
+
+# Parsed product catalog, reused while the Excel file is unchanged (empty disables the cache)
+product_catalog_cache_path = os.getenv("PRODUCT_CATALOG_CACHE_PATH", ".product_catalog.pickle")
+
 # Set up WebDriver
-options = Options()
-options.add_argument("--disable-notifications")
-options.add_argument('--no-sandbox')
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=options)
-driver.maximize_window()
+def create_driver(session=None):
+    options = Options()
+    options.add_argument("--disable-notifications")
+    options.add_argument('--no-sandbox')
+    if browser_mode == "lean":
+        configure_lean(options, lean_window_size, lean_cache_mb)
+    if session is not None:
+        session.configure(options)
+    service = Service(cached_driver_path(chromedriver_cache_path))
+    browser = webdriver.Chrome(service=service, options=options)
+    if browser_mode == "lean":
+        block_resources(browser)
+    else:
+        browser.maximize_window()
+    return instrument_driver(browser)
+
+def create_managed_driver(session=None, name="browser"):
+    return ManagedDriver(
+        lambda: create_driver(session), browser_recycle_articles, browser_recycle_rss_mb, name=name
+    )
+
+driver = create_managed_driver(naver_session)
 
 def extract_product_info(excel_file):
-    df = pd.read_excel(excel_file)
-    product_category_mapping = {
-        re.sub(r"[\[\(].*?[\]\)]", "", row['상품명']).strip(): row['카테고리']
-        for _, row in df.iterrows()
-    }
-    return product_category_mapping
+    return load_catalog(excel_file, product_catalog_cache_path or None)
 
+@timed("login")
 def login_to_naver():
     url = "https://nid.naver.com/nidlogin.login"
     driver.get(url)
@@ -47,161 +189,315 @@ def login_to_naver():
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "id")).send_keys(naver_marketing_id)
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "pw")).send_keys(naver_marketing_password)
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "log.login")).click()
-        time.sleep(20)  # Allow time for CAPTCHA manually
     except TimeoutException:
-        print("Login elements did not load in time.")
-
-def scrape_posts(search_keyword, start_page=1, end_page=3, processed_titles=set(), start_date=None, end_date=None):
+        logger.warning("Login elements did not load in time.")
+        return
+    try:
+        # Returns as soon as the login page is left, leaving time to solve a CAPTCHA manually
+        wait_for_login(driver, login_timeout)
+    except TimeoutException:
+        logger.warning(f"Still on the login page after {login_timeout:.0f}s")
+
+def scrape_posts(search_keyword, start_page=1, end_page=3, processed_articles=None, start_date=None, end_date=None,
+                 article_fetcher=None, browser=None, crawl_summary=None, crawl_state=None, cafe_url=None, on_post=None,
+                 stop_event=None):
+    # With on_post set, every post is handed to it as soon as its page is done instead of being returned;
+    # once stop_event is set, the crawl stops before the next page and stays resumable
+    if browser is None:
+        browser = driver
+    if processed_articles is None:
+        processed_articles = set()
+    if crawl_summary is None:
+        crawl_summary = {}
+    for key in ("pages_read", "pages_skipped", "pages_probed", "posts_out_of_range", "posts_reused"):
+        crawl_summary.setdefault(key, 0)
     scraped_data = []
+    date_filter = f"{start_date}~{end_date}"
+    error_stop = False
 
-    try:
-        search_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//input[@name="query"]'))
-        )
-        search_input.clear()
-        search_input.send_keys(search_keyword)
+    def open_search():
+        with span("search"):
+            search_input = WebDriverWait(browser, 10).until(
+                EC.presence_of_element_located((By.XPATH, '//input[@name="query"]'))
+            )
+            search_input.clear()
+            search_input.send_keys(search_keyword)
 
-        search_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//button[@onclick="searchBoard();return false;"]'))
-        )
-        search_button.click()
-        time.sleep(2)
+            search_button = WebDriverWait(browser, 10).until(
+                EC.element_to_be_clickable((By.XPATH, '//button[@onclick="searchBoard();return false;"]'))
+            )
+            previous_frame_url = cafe_frame_url(browser)
+            search_button.click()
+            wait_for_cafe_frame(browser, previous_frame_url, "search", wait_timeout)
+
+        WebDriverWait(browser, 10).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main")))
 
-        WebDriverWait(driver, 10).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main")))
+    try:
+        open_search()
 
         if start_date:
             start_date = datetime.strptime(start_date, "%Y-%m-%d")
         if end_date:
             end_date = datetime.strptime(end_date, "%Y-%m-%d")
 
+        # Search results are newest-first, so whole pages can be judged by their oldest/newest row
+        def newer_than_range(rows):
+            date_range = page_date_range(rows)
+            return date_range is not None and date_range[0] > end_date
+
+        def older_than_range(rows):
+            date_range = page_date_range(rows)
+            return date_range is not None and date_range[1] < start_date
+
         current_page = start_page
+        if crawl_state is not None:
+            # Resume after the last completed page of an interrupted run of this job
+            current_page, resumed_posts = crawl_state.begin(cafe_url, search_keyword, start_page, end_page, date_filter)
+            processed_articles.update(post_key(item) for item in resumed_posts)
+            if on_post is not None:
+                for item in resumed_posts:
+                    on_post(item)
+            else:
+                scraped_data.extend(resumed_posts)
+        if 1 < current_page <= end_page:
+            go_to_page(browser, current_page)
 
         while current_page <= end_page:
-            print(f"Scraping page {current_page}...")
+            if stop_event is not None and stop_event.is_set():
+                logger.info(f"Stopping before page {current_page}: the crawl was interrupted")
+                error_stop = True
+                break
+            logger.info(f"Scraping page {current_page}...")
 
             try:
-                post_elements = driver.find_elements(By.XPATH, '//a[contains(@class, "article")]')
-                if not post_elements:
-                    print(f"No posts found on page {current_page}")
+                # Every row's title, date and link in one round-trip instead of per-row DOM queries
+                rows = snapshot_list_page(browser)
+                if not rows:
+                    logger.info(f"No posts found on page {current_page}")
+                    break
+
+                if end_date and newer_than_range(rows):
+                    # Jump to the first page that can hold posts up to end_date without opening any post
+                    with span("page_navigation"):
+                        found_page, found_rows, probes = seek_page(browser, current_page, end_page, newer_than_range)
+                    crawl_summary["pages_probed"] += probes
+                    crawl_summary["pages_skipped"] += (found_page or end_page + 1) - current_page
+                    if found_page is None:
+                        logger.info(f"No page up to {end_page} has posts before {end_date:%Y-%m-%d}")
+                        break
+                    logger.info(f"Skipped pages {current_page}-{found_page - 1}: all posts are newer than {end_date:%Y-%m-%d}")
+                    current_page, rows = found_page, found_rows
+
+                if start_date and older_than_range(rows):
+                    # Every later page is older still
+                    crawl_summary["pages_skipped"] += end_page - current_page + 1
+                    logger.info(f"Stopping at page {current_page}: all posts are older than {start_date:%Y-%m-%d}")
                     break
 
-                for j in range(len(post_elements)):
-                    post_elements = driver.find_elements(By.XPATH, '//a[contains(@class, "article")]')
+                crawl_summary["pages_read"] += 1
+
+                # Articles read over HTTP are collected per page and fetched together
+                page_articles = []
+                page_posts = []
+
+                def add_post(row, post_date, title, content, comments, replies):
+                    item = {
+                        "Date": post_date.strftime("%Y-%m-%d %H:%M"),
+                        "Title": title,
+                        "Content": content,
+                        "Combined": f"{title} {content} " + " ".join(comments) + " " + " ".join(replies),
+                        "CafeId": row["cafe_id"],
+                        "ArticleId": row["article_id"],
+                        "CafeUrl": cafe_url,
+                        "Keyword": search_keyword,
+                        "Comments": comments,
+                        "Replies": replies
+                    }
+                    page_posts.append(item)
+                    if crawl_state is not None:
+                        crawl_state.save_article(row["cafe_id"], row["article_id"], row["comment_count"], item)
+
+                for row in rows:
+                    j = row["index"]
 
                     try:
-                        date_element_xpath = f'(//td[@class="td_date"])[{j+1}]'
-                        date_element = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.XPATH, date_element_xpath))
-                        )
-                        date_text = date_element.text
-                        print(f"Post {j+1} has date: {date_text}")
+                        date_text = row["date"]
+                        if date_text is None:
+                            raise NoSuchElementException(f"No date cell for post {j+1}")
+                        logger.debug(f"Post {j+1} has date: {date_text}")
 
-                        if re.match(r"^\d{2}:\d{2}$", date_text):
-                            today = datetime.today()
-                            post_date = datetime.combine(today.date(), datetime.strptime(date_text, "%H:%M").time())
-                        else:
-                            post_date = datetime.strptime(date_text.strip(), "%Y.%m.%d.")
+                        post_date = parse_list_date(date_text)
 
                         if (start_date and post_date < start_date) or (end_date and post_date > end_date):
-                            print(f"Skipping post {j+1} as it does not match the date filter")
+                            logger.debug(f"Skipping post {j+1} as it does not match the date filter")
+                            crawl_summary["posts_out_of_range"] += 1
                             continue
 
-                        post_element = post_elements[j]
-                        title = post_element.text.strip()
+                        title = row["title"]
+                        article_key = post_key({"Title": title, "CafeId": row["cafe_id"], "ArticleId": row["article_id"]})
 
                         # Skip posts already processed
-                        if title in processed_titles:
-                            print(f"Skipping post {j+1} with title '{title}' as it is already processed")
+                        if article_key in processed_articles:
+                            logger.debug(f"Skipping post {j+1} with title '{title}' as it is already processed")
                             continue
 
-                        print(f"Scraping post {j+1}: {title}")
-
-                        post_element.click()
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "se-main-container")]'))
-                        )
-                        time.sleep(2)
+                        if crawl_state is not None:
+                            stored_post = crawl_state.unchanged_article(row["cafe_id"], row["article_id"], row["comment_count"])
+                            if stored_post is not None:
+                                logger.debug(f"Reusing post {j+1}: {title} (unchanged since the last crawl)")
+                                processed_articles.add(article_key)
+                                page_posts.append(stored_post)
+                                crawl_summary["posts_reused"] += 1
+                                continue
+
+                        if article_fetcher is not None and row["article_id"] is not None:
+                            processed_articles.add(article_key)
+                            page_articles.append((row, post_date, title))
+                            continue
 
-                        content_xpath = '//div[contains(@class, "se-main-container")]'
-                        content_element = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.XPATH, content_xpath))
-                        )
-                        content = content_element.text
+                        logger.debug(f"Scraping post {j+1}: {title}")
+
+                        article_done(browser)
+                        with span("article_load"):
+                            post_element = browser.find_element(By.XPATH, f'(//a[contains(@class, "article")])[{j+1}]')
+                            post_element.click()
+                            timed_wait("article_open", browser, EC.presence_of_element_located(
+                                (By.XPATH, '//div[contains(@class, "se-main-container")]')
+                            ), wait_timeout)
+                            # Comments load after the body
+                            wait_for_network_idle(browser, "article_settle", network_idle_ms, network_idle_timeout)
+                            record_page_load(browser, "article")
+
+                        if article_extract_mode == "script":
+                            # Body, comments and replies (all comment pages) in one script evaluation
+                            with span("comment_extraction"):
+                                article = extract_article(browser, max_comment_pages=max_comment_pages)
+                            if article["content"] is None:
+                                raise NoSuchElementException("se-main-container not found")
+                            content, comments, replies = article["content"], article["comments"], article["replies"]
+                            logger.debug(f"Extracted post {j+1} ({article['comment_pages']} comment pages) in {article['elapsed']:.2f}s")
+                        else:
+                            extract_start = time.perf_counter()
+                            content_xpath = '//div[contains(@class, "se-main-container")]'
+                            content_element = WebDriverWait(browser, 10).until(
+                                EC.presence_of_element_located((By.XPATH, content_xpath))
+                            )
+                            content = content_element.text
 
-                        comments, replies = extract_comments()
+                            with span("comment_extraction"):
+                                comments, replies = extract_comments(browser)
+                            record_timing("legacy", time.perf_counter() - extract_start)
 
-                        # Add post title to processed_titles to avoid duplicates
-                        processed_titles.add(title)
+                        # Add the post to processed_articles to avoid duplicates
+                        processed_articles.add(article_key)
 
-                        scraped_data.append({
-                            "Date": post_date.strftime("%Y-%m-%d %H:%M"),
-                            "Title": title,
-                            "Content": content,
-                            "Combined": f"{title} {content} " + " ".join(comments) + " " + " ".join(replies)
-                        })
+                        add_post(row, post_date, title, content, comments, replies)
 
-                        driver.back()
-                        WebDriverWait(driver, 10).until(
+                        browser.back()
+                        WebDriverWait(browser, 10).until(
                             EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main"))
                         )
 
-                    except (StaleElementReferenceException, TimeoutException, NoSuchElementException) as e:
-                        print(f"Error with post {j+1} on page {current_page}: {e}")
+                    except (StaleElementReferenceException, TimeoutException, NoSuchElementException, JavascriptException) as e:
+                        logger.warning(f"Error with post {j+1} on page {current_page}: {e}")
                         continue
 
+                if page_articles:
+                    with span("article_fetch"):
+                        articles = article_fetcher.fetch_articles([(row["cafe_id"], row["article_id"]) for row, _, _ in page_articles])
+                    incr("articles_fetched", len(articles))
+                    for (row, post_date, title), article in zip(page_articles, articles):
+                        j = row["index"]
+                        if isinstance(article, Exception):
+                            logger.warning(f"Error fetching post {j+1} (article {row['article_id']}) on page {current_page}: {article}")
+                            processed_articles.discard((row["cafe_id"], row["article_id"]))
+                            continue
+                        logger.debug(f"Scraped post {j+1} over HTTP: {title}")
+                        add_post(row, post_date, title, article["content"], article["comments"], article["replies"])
+
+                if on_post is not None:
+                    for item in page_posts:
+                        on_post(item)
+                else:
+                    scraped_data.extend(page_posts)
+                if crawl_state is not None:
+                    crawl_state.complete_page(cafe_url, search_keyword, start_page, current_page, page_posts)
+
+                # A restarted browser repeats the search in the cafe and jumps straight to the next page
+                if current_page < end_page and cafe_url is not None and recycle_if_needed(browser):
+                    browser.get(cafe_url)
+                    record_page_load(browser, "cafe")
+                    open_search()
+                    current_page += 1
+                    go_to_page(browser, current_page)
+                    continue
+
                 # Determine next page or next button actions
                 if current_page % 10 == 0 and current_page < end_page:
                     next_button_xpath = '//a[@class="pgR"]/span[@class="m-tcol-c"][text()="다음"]'
                     try:
-                        next_button_element = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, next_button_xpath))
-                        )
-                        next_button_element.click()
-                        time.sleep(2)
+                        with span("page_navigation"):
+                            next_button_element = WebDriverWait(browser, 10).until(
+                                EC.element_to_be_clickable((By.XPATH, next_button_xpath))
+                            )
+                            previous_list = list_signature(browser)
+                            next_button_element.click()
+                            wait_for_list_change(browser, previous_list, "next_block", wait_timeout)
+                            record_page_load(browser, "list")
                     except (TimeoutException, NoSuchElementException) as e:
-                        print(f"No more pages or error clicking next button (page {current_page}): {e}")
+                        logger.info(f"No more pages or error clicking next button (page {current_page}): {e}")
                         break
                 elif current_page < end_page:
                     next_page_link_xpath = f'//a[text()="{current_page + 1}"]'
                     try:
-                        next_page_element = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, next_page_link_xpath))
-                        )
-                        next_page_element.click()
-                        time.sleep(2)
+                        with span("page_navigation"):
+                            next_page_element = WebDriverWait(browser, 10).until(
+                                EC.element_to_be_clickable((By.XPATH, next_page_link_xpath))
+                            )
+                            previous_list = list_signature(browser)
+                            next_page_element.click()
+                            wait_for_list_change(browser, previous_list, "next_page", wait_timeout)
+                            record_page_load(browser, "list")
                     except (TimeoutException, NoSuchElementException) as e:
-                        print(f"No more pages or error clicking next page (page {current_page}): {e}")
+                        logger.info(f"No more pages or error clicking next page (page {current_page}): {e}")
                         break
                 current_page += 1
 
             except (TimeoutException, NoSuchElementException) as e:
-                print(f"Error with scraping on page {current_page}: {e}")
+                logger.warning(f"Error with scraping on page {current_page}: {e}")
+                error_stop = True
                 break
 
+        # A crawl that stopped on an error stays resumable from its last completed page
+        if crawl_state is not None and not error_stop:
+            crawl_state.finish(cafe_url, search_keyword, start_page)
+
     except TimeoutException as e:
-        print(f"Error with initial search setup: {e}")
+        logger.error(f"Error with initial search setup: {e}")
 
+    logger.info(f"Crawl summary for '{search_keyword}' (pages {start_page}-{end_page}): {crawl_summary}")
     return scraped_data
 
-def extract_comments():
+def extract_comments(browser=None):
+    if browser is None:
+        browser = driver
+
     comments = []
     replies = []
 
     try:
-        comment_elements = driver.find_elements(By.XPATH, '//span[@class="text_comment"]')
+        comment_elements = browser.find_elements(By.XPATH, '//li[not(contains(@class,"CommentItem--reply"))]//span[@class="text_comment"]')
         comments = [element.text for element in comment_elements]
 
-        reply_elements = driver.find_elements(By.XPATH, '//li[contains(@class,"CommentItem--reply")]//span[@class="text_comment"]')
+        reply_elements = browser.find_elements(By.XPATH, '//li[contains(@class,"CommentItem--reply")]//span[@class="text_comment"]')
         replies = [element.text for element in reply_elements]
 
     except (TimeoutException, NoSuchElementException) as e:
-        print(f"Error extracting comments or replies: {e}")
+        logger.warning(f"Error extracting comments or replies: {e}")
 
     return comments, replies
 
-def analyze_with_gpt4o(all_data, product_category_mapping):
-    client = OpenAI(api_key=OpenAI.api_key)
-    system_prompt = (
+analysis_system_prompt = (
         """당신은 감정 분석과 마케팅에 유능한 전문가입니다. 주어진 각 텍스트에 대해 다음을 수행하세요:
     
         1. 주어진 목록에서 각 제품명이 몇 번 언급되었는지 식별합니다.
@@ -209,120 +505,87 @@ def analyze_with_gpt4o(all_data, product_category_mapping):
         3. 포스트, 댓글 및 대댓글의 전반적인 감정을 긍정적, 부정적, 중립적으로 분석하고 분류합니다.
     
         응답은 감정 분류를 구조화된 형식으로 제공하세요 (예: 감정: 긍정적/부정적/중립적)."""
-    )
+)
 
-    product_count = defaultdict(int)
-    category_count = defaultdict(int)
-    sentiment_count = {'positive': 0, 'neutral': 0, 'negative': 0}
-    total_posts = len(all_data)
+def analyze_with_gpt4o(all_data, product_category_mapping, sink=None):
+    client = OpenAI(api_key=OpenAI.api_key)
+    all_texts = [item["Combined"] for item in all_data]
+
+    # Clearly positive or negative posts are settled locally; the rest go to GPT-4o
+    results = [None] * len(all_texts)
+    llm_indices = list(range(len(all_texts)))
+    if sentiment_classifier is not None:
+        llm_indices = []
+        for index, sentiment in enumerate(sentiment_classifier.classify_batch(all_texts)):
+            if sentiment_classifier.is_confident(sentiment):
+                results[index] = local_result(sentiment)
+            else:
+                llm_indices.append(index)
+        logger.info(f"Local sentiment: {len(all_texts) - len(llm_indices)} of {len(all_texts)} posts classified locally, "
+                    f"{len(llm_indices)} sent to GPT-4o")
+    texts = [all_texts[index] for index in llm_indices]
+
+    rate_limiter = RateLimiter(llm_requests_per_minute or None, llm_tokens_per_minute or None)
+    cache = LLMCache(llm_cache_path, llm_cache_max_entries, llm_cache_max_age_days)
+    engine_kwargs = {"max_workers": llm_max_workers, "rate_limiter": rate_limiter, "cache": cache}
+    try:
+        with span("llm_analysis"):
+            if llm_mode == "packed":
+                llm_results = run_packed_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, texts, 8192, **engine_kwargs
+                )
+            elif llm_output == "json":
+                llm_results = run_structured_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, texts, llm_json_max_tokens, llm_json_max_attempts,
+                    llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens, **engine_kwargs
+                )
+                logger.info(f"LLM tokens: {token_report(llm_results)}")
+                logger.info(f"Structured output: {output_report(llm_results)}")
+            else:
+                llm_results = run_chunked_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, texts, 8192,
+                    llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens, **engine_kwargs
+                )
+                logger.info(f"LLM tokens: {token_report(llm_results)}")
+                logger.info(f"Prose output: {output_report(llm_results)}")
+        logger.info(f"LLM cache: {cache.stats()}")
+    finally:
+        cache.close()
 
-    summaries = []
+    for index, result in zip(llm_indices, llm_results):
+        results[index] = result
+    count_llm_results(results)
 
-    for item in all_data:
-        text = item["Combined"]
-        try:
-            chat_completion = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=8192
-            )
-            summary = chat_completion.choices[0].message.content.strip()
-            summaries.append(summary)
-
-            # Count product mentions per category: each product is counted only once per post
-            mentioned_products = set()
-            for product, category in product_category_mapping.items():
-                product_regex = re.compile(re.escape(product.replace(" ", "")), re.IGNORECASE)
-                if product_regex.search(text.replace(" ", "")) and product not in mentioned_products:
-                    mentioned_products.add(product)
-                    product_count[product] += 1
-                    category_count[category] += 1
-
-            # Extract sentiment from the structured response
-            if "감정: 긍정적" in summary:
-                sentiment_count['positive'] += 1
-            elif "감정: 부정적" in summary:
-                sentiment_count['negative'] += 1
-            elif "감정: 중립적" in summary:
-                sentiment_count['neutral'] += 1
-            else:
-                print(f"Sentiment not detected correctly in summary: {summary}")
+    return tally_results(all_data, results, product_category_mapping, sink)
 
-        except Exception as e:
-            print(f"Error during GPT-4o call: {e}")
-            summaries.append("Error processing text")
+def tally_results(all_data, results, product_category_mapping, sink=None):
+    """
+    Turns per-post LLM results into the summaries and product/category/sentiment counts for the report.
 
-    return summaries, dict(product_count), dict(category_count), dict(sentiment_count), total_posts
+    Each post in all_data also gets the "Sentiment" and "Products" the aggregator found for it,
+    which the report's CSV and HTML copies list per post.
+    """
+    def annotate(item, entry, summary):
+        item["Sentiment"] = entry["Sentiment"]
+        item["Products"] = entry["Products"]
+        if sink is not None:
+            sink(item, entry, summary)
+
+    aggregator = ReportAggregator(product_category_mapping, sentiment_classifier, annotate)
+    for seq, (item, result) in enumerate(zip(all_data, results)):
+        aggregator.add(seq, item, result)
+    _, summaries, product_count, category_count, sentiment_count, _ = aggregator.results()
+    return summaries, product_count, category_count, sentiment_count, len(all_data)
 
 def write_summary_to_docx(product_count, category_count, sentiment_count, total_posts, all_data, summaries, output_file):
     """
     Writes a summarized analysis of the data and sentiment to a DOCX file.
     """
-    doc = Document()
-
-    # Add a title for the document
-    doc.add_heading('Sentiment Analysis Summary', level=1)
-
-    # Create table for product mentions (sorted alphabetically by product name)
-    doc.add_heading('Product Mentions', level=2)
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Product'
-    hdr_cells[1].text = 'Count'
-    
-    for product in sorted(product_count):
-        row_cells = table.add_row().cells
-        row_cells[0].text = product
-        row_cells[1].text = str(product_count[product])
-
-    # Create table for category mentions (sorted alphabetically by category name)
-    doc.add_heading('Category Mentions', level=2)
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Category'
-    hdr_cells[1].text = 'Total Mentions'
-    
-    for category in sorted(category_count):
-        row_cells = table.add_row().cells
-        row_cells[0].text = category
-        row_cells[1].text = str(category_count[category])
-
-    # Create table for sentiment analysis
-    doc.add_heading('Sentiment Analysis', level=2)
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Sentiment'
-    hdr_cells[1].text = 'Count'
-    for sentiment, count in sentiment_count.items():
-        row_cells = table.add_row().cells
-        row_cells[0].text = sentiment
-        row_cells[1].text = str(count)
-
-    # Total posts overview
-    doc.add_heading('Overview', level=2)
-    table = doc.add_table(rows=1, cols=2)
-    table.style = 'Table Grid'
-    row_cells = table.add_row().cells
-    row_cells[0].text = 'Total Posts'
-    row_cells[1].text = str(total_posts)
-
-    # Add detailed summaries with titles at the end
-    doc.add_heading('Detailed Summaries', level=2)
-    for item, summary in zip(all_data, summaries):
-        # Add the post title as a heading
-        doc.add_heading(f"Title: {item['Title']}", level=3)
-        doc.add_paragraph(summary)
-        doc.add_paragraph("\n")  # Space between summaries
-
-    # Save the document
-    doc.save(output_file)
-    print(f"Results saved to {output_file}")
+    with span("docx_write"):
+        write_summary_report(
+            product_count, category_count, sentiment_count, total_posts, all_data, summaries, output_file,
+            report_max_posts_per_file, report_companions
+        )
 
 def main():
     cafe_urls = [
@@ -333,51 +596,225 @@ def main():
     search_keywords = "'카즈미', 'KZM', 'KZM OUTDOOR'"
     search_keywords_list = [kw.strip().strip("'") for kw in search_keywords.split(',')]
 
-    login_to_naver()
+    excel_file_path = r"C:\Users\jung\Desktop\AICC\playauto\product\items.xls"
+
+    if report_source == "store":
+        # Report on posts already in the corpus store: no crawl, no LLM calls
+        store = CorpusStore(corpus_store_path)
+        started = time.time()
+        posts = store.load(report_start_date or None, report_end_date or None, report_cafes or None)
+        summaries, product_count, category_count, sentiment_count, total_posts = aggregate(
+            posts, extract_product_info(excel_file_path)
+        )
+        logger.info(f"Corpus store: {total_posts} posts aggregated in {time.time() - started:.1f}s")
+        write_summary_to_docx(
+            product_count, category_count, sentiment_count, total_posts, report_posts(posts), summaries,
+            'summary_results.docx'
+        )
+        logger.info("Summaries have been generated and saved.")
+        return
+
+    store = None
+    if corpus_store_path:
+        try:
+            store = CorpusStore(corpus_store_path)
+        except RuntimeError as e:
+            # The store is on by default but optional: without pyarrow the report is written without it
+            logger.warning(f"Corpus store disabled: {e}")
+    sink = store.add if store is not None else None
+
+    if llm_mode == "batch-ingest":
+        # Build the report from a finished Batch API job without scraping again
+        all_data, results = read_batch_job(llm_batch_path, llm_batch_output_path)
+        product_category_mapping = extract_product_info(excel_file_path)
+        try:
+            summaries, product_count, category_count, sentiment_count, total_posts = tally_results(
+                all_data, results, product_category_mapping, sink
+            )
+        finally:
+            if store is not None:
+                store.close()
+        write_summary_to_docx(
+            product_count, category_count, sentiment_count, total_posts, all_data, summaries, 'summary_results.docx'
+        )
+        logger.info("Summaries have been generated and saved.")
+        return
+
+    if pipeline_mode == "streaming" and llm_mode != "online":
+        raise ValueError("PIPELINE_MODE=streaming only supports LLM_MODE=online")
+
+    # Log in only when the saved session has expired
+    naver_session.ensure_login(driver, login_to_naver)
+
+    article_fetcher = ArticleFetcher.from_driver(driver) if article_fetch_mode == "http" else None
 
     all_data = []
-    processed_titles = set()  # Set to keep track of processed post titles
+    processed_articles = set()  # Set to keep track of processed posts, by article id
+    crawl_state = CrawlState(crawl_state_path) if crawl_state_path else None
 
     start_date = "2024-11-01"  # Example start date
     end_date = "2024-11-30"    # Example end date
 
-    for keyword in search_keywords_list:
-        for idx, cafe_url in enumerate(cafe_urls):
-            print(f"Searching for keyword: {keyword} in cafe: {cafe_url}")
-            if idx > 0:
-                driver.execute_script("window.open('');")
-                driver.switch_to.window(driver.window_handles[-1])
-
-            driver.get(cafe_url.strip())
-            
-            # Scrape posts for each keyword individually
-            data = scrape_posts(
-                search_keyword=keyword,
-                start_page=1,
-                end_page=22,
-                processed_titles=processed_titles,
-                start_date=start_date,
-                end_date=end_date
-            )
-            all_data.extend(data)
+    pipeline = None
+    if pipeline_mode == "streaming":
+        # Posts are analyzed as soon as their result page is scraped, so the mapping is needed up front
+        product_category_mapping = extract_product_info(excel_file_path)
+        client = OpenAI(api_key=OpenAI.api_key)
+        rate_limiter = RateLimiter(llm_requests_per_minute or None, llm_tokens_per_minute or None)
+        cache = LLMCache(llm_cache_path, llm_cache_max_entries, llm_cache_max_age_days)
+
+        def request_analysis(item):
+            if sentiment_classifier is not None:
+                sentiment = sentiment_classifier.classify(item["Combined"])
+                if sentiment_classifier.is_confident(sentiment):
+                    return local_result(sentiment)
+            if llm_output == "json":
+                return run_structured_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, [item["Combined"]], llm_json_max_tokens,
+                    llm_json_max_attempts, llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens,
+                    max_workers=llm_max_workers, rate_limiter=rate_limiter, cache=cache
+                )[0]
+            return run_chunked_chat_completions(
+                client, "gpt-4o", analysis_system_prompt, [item["Combined"]], 8192,
+                llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens,
+                max_workers=llm_max_workers, rate_limiter=rate_limiter, cache=cache
+            )[0]
+
+        def analyze_post(item):
+            with span("llm_post"):
+                result = request_analysis(item)
+            count_llm_results([result], stage="streaming")
+            return result
+
+        pipeline = StreamingPipeline(
+            analyze_post,
+            ReportAggregator(product_category_mapping, sentiment_classifier, sink),
+            max_workers=llm_max_workers,
+            max_pending=pipeline_max_pending,
+            checkpoint_path=pipeline_checkpoint_path or None,
+            near_duplicates=NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold > 0 else None
+        )
+
+    def scrape_job(browser, job):
+        logger.info(f"Searching for keyword: {job['keyword']} in cafe: {job['cafe_url']}")
+        # Every job runs in the worker's one tab, on a fresh browser once the last one is over its limits
+        recycle_if_needed(browser)
+        browser.close_extra_tabs()
+        browser.get(job["cafe_url"])
+        record_page_load(browser, "cafe")
+
+        # Scrape posts for each keyword individually. A single worker shares processed_articles
+        # across jobs like the serial loop; parallel jobs are de-duplicated after merging.
+        return scrape_posts(
+            search_keyword=job["keyword"],
+            start_page=job["start_page"],
+            end_page=job["end_page"],
+            processed_articles=processed_articles if crawler_workers == 1 else set(),
+            start_date=start_date,
+            end_date=end_date,
+            article_fetcher=article_fetcher,
+            browser=browser,
+            crawl_state=crawl_state,
+            cafe_url=job["cafe_url"],
+            on_post=pipeline.submit if pipeline is not None else None,
+            stop_event=pool.stop_event
+        )
+
+    jobs = build_jobs(cafe_urls, search_keywords_list, 1, 22, crawler_pages_per_job)
+    worker_drivers = [create_managed_driver(name=f"browser {number}") for number in range(1, crawler_workers)]
+    interrupted = False
+    crawled = False
+    try:
+        for worker_driver in worker_drivers:
+            copy_session(driver, worker_driver)
+        pool = CrawlerPool([driver] + worker_drivers, per_cafe_limit=crawler_per_cafe_limit)
+        job_results = pool.run(jobs, scrape_job)
+        crawled = True
+    except KeyboardInterrupt:
+        if pipeline is None:
+            raise
+        interrupted = True
+        logger.info("Interrupted: writing a partial report from the posts analyzed so far")
+    finally:
+        rss = browser_rss(started_drivers([driver] + worker_drivers))
+        if rss is not None:
+            logger.info(f"Browser RSS ({browser_mode} mode): {rss / 1024 / 1024:.0f} MB")
+        for worker_driver in worker_drivers:
+            worker_driver.quit()
+        if crawl_state is not None:
+            crawl_state.close()
+        # The store and the streaming cache are closed whether the crawl finished, was interrupted or failed
+        if pipeline is not None:
+            try:
+                # Posts still queued when the crawl stopped early are dropped
+                pipeline.close(cancel_pending=not crawled)
+                logger.info(f"LLM cache: {cache.stats()}")
+            finally:
+                cache.close()
+                if store is not None:
+                    store.close()
+        elif not crawled and store is not None:
+            store.close()
+
+    if pipeline is not None:
+        # Posts were de-duplicated and analyzed as they arrived; only the report is left to write
+        all_data, summaries, product_count, category_count, sentiment_count, total_posts = pipeline.aggregator.results()
+        output_file = 'summary_results.partial.docx' if interrupted else 'summary_results.docx'
+        write_summary_to_docx(
+            product_count, category_count, sentiment_count, total_posts, all_data, summaries, output_file
+        )
+        logger.info(f"Article extraction timings: {timing_summary()}")
+        logger.info(f"Wait timings per step: {wait_summary()}")
+        logger.info(f"Page load times ({browser_mode} mode): {page_load_summary()}")
+        logger.info("Summaries have been generated and saved.")
+        return
+
+    # Merge in job order, so the kept copy of a repeated post is the one the serial loop would keep
+    for data in job_results:
+        for item in data:
+            if crawler_workers > 1 and post_key(item) in processed_articles:
+                continue
+            processed_articles.add(post_key(item))
+            all_data.append(item)
+
+    logger.info(f"Article extraction timings: {timing_summary()}")
+    logger.info(f"Wait timings per step: {wait_summary()}")
+    logger.info(f"Page load times ({browser_mode} mode): {page_load_summary()}")
+
+    if near_duplicate_threshold > 0:
+        # Only the first post of each near-duplicate group is analyzed and counted
+        all_data = group_near_duplicates(all_data, NearDuplicateIndex(near_duplicate_threshold), post_key)
+
+    if llm_mode == "batch-write":
+        texts = [item["Combined"] for item in all_data]
+        requests, groups = build_requests("gpt-4o", analysis_system_prompt, texts, 8192, packed=llm_batch_packed)
+        write_batch_job(llm_batch_path, requests, groups, all_data, analysis_system_prompt)
+        if store is not None:
+            store.close()
+        logger.info("Upload the batch file to the Batch API, then rerun with LLM_MODE=batch-ingest.")
+        return
 
     # Load product category mapping from Excel
-    excel_file_path = r"C:\Users\jung\Desktop\AICC\playauto\product\items.xls"
     product_category_mapping = extract_product_info(excel_file_path)
     
-    # Analyze scraped data with GPT-4o
-    summaries, product_count, category_count, sentiment_count, total_posts = analyze_with_gpt4o(
-        all_data, product_category_mapping
-    )
+    # Analyze scraped data with GPT-4o; the posts analyzed so far are kept in the store even if it fails
+    try:
+        summaries, product_count, category_count, sentiment_count, total_posts = analyze_with_gpt4o(
+            all_data, product_category_mapping, sink
+        )
+    finally:
+        if store is not None:
+            store.close()
 
     # Write summarized analysis to a DOCX file
     write_summary_to_docx(
         product_count, category_count, sentiment_count, total_posts, all_data, summaries, 'summary_results.docx'
     )
-    print("Summaries have been generated and saved.")
+    logger.info("Summaries have been generated and saved.")
 
 if __name__ == "__main__":
+    configure_logging(log_level)
     try:
-        main()
+        run_main(main, "Marketing_report", metrics_path or None, profile_path or None)
     finally:
-        driver.quit()
\ No newline at end of file
+        driver.quit()
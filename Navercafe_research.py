@@ -1,17 +1,36 @@
 import os
+import logging
 from openai import OpenAI
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, JavascriptException
 from dotenv import load_dotenv
 import time
 from datetime import datetime
 import docx
+from article_fetcher import ArticleFetcher
+from list_page import go_to_page, page_date_range, parse_list_date, snapshot_list_page
+from article_extractor import extract_article, record_timing, timing_summary
+from crawler_pool import CrawlerPool, build_jobs, copy_session
+from crawl_state import CrawlState, post_key
+from llm_engine import RateLimiter
+from llm_batch import run_packed_chat_completions
+from llm_cache import LLMCache
+from llm_chunking import run_chunked_chat_completions, token_report
+from pipeline import StreamingPipeline, SummaryAggregator
+from near_duplicates import NearDuplicateIndex, group_near_duplicates
+from browser_session import NaverSession, cached_driver_path
+from browser_profile import block_resources, browser_rss, configure_lean, page_load_summary, record_page_load
+from docx_report import append_paragraphs
+from waits import cafe_frame_url, list_signature, timed_wait, wait_for_cafe_frame, wait_for_list_change, wait_for_login, wait_for_network_idle, wait_summary
+from driver_manager import ManagedDriver, article_done, recycle_if_needed, started_drivers
+from metrics import configure_logging, count_llm_results, incr, instrument_driver, run_main, span, timed
+
+logger = logging.getLogger("Navercafe_research")
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,13 +40,107 @@ naver_marketing_id = os.getenv("NAVER_MARKETING_ID")
 naver_marketing_password = os.getenv("NAVER_MARKETING_PASSWORD")
 OpenAI.api_key = os.getenv("OPENAI_API_KEY")  # Ensure your OpenAI API key is in the .env file
 
+# LLM concurrency and rate budgets (0 disables a budget)
+llm_max_workers = int(os.getenv("LLM_MAX_WORKERS", "8"))
+llm_requests_per_minute = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+llm_tokens_per_minute = int(os.getenv("LLM_TOKENS_PER_MINUTE", "450000"))
+
+# On-disk cache of LLM summaries, so reruns only pay for new or edited posts
+llm_cache_path = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+llm_cache_max_age_days = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "90"))
+
+# LLM request mode: "online" (one request per post) or "packed" (many short posts per request)
+llm_mode = os.getenv("LLM_MODE", "online")
+
+# Posts over LLM_MAX_INPUT_TOKENS are split into LLM_CHUNK_TOKENS chunks that are summarized in
+# parallel (at most LLM_CHUNK_SUMMARY_TOKENS each) and then analyzed together
+llm_max_input_tokens = int(os.getenv("LLM_MAX_INPUT_TOKENS", "8000"))
+llm_chunk_tokens = int(os.getenv("LLM_CHUNK_TOKENS", "4000"))
+llm_chunk_summary_tokens = int(os.getenv("LLM_CHUNK_SUMMARY_TOKENS", "512"))
+
+# "browser" opens every post in Chrome, "http" reads post bodies and comments from the article API
+article_fetch_mode = os.getenv("ARTICLE_FETCH_MODE", "browser")
+
+# "script" reads an opened post (body and every comment page) in one script call, "legacy" element by element
+article_extract_mode = os.getenv("ARTICLE_EXTRACT_MODE", "script")
+max_comment_pages = int(os.getenv("MAX_COMMENT_PAGES", "10"))
+
+# Crawler pool: browsers crawling at once, jobs allowed per cafe at once, pages per job (0 = whole range)
+crawler_workers = int(os.getenv("CRAWLER_WORKERS", "1"))
+crawler_per_cafe_limit = int(os.getenv("CRAWLER_PER_CAFE_LIMIT", "2"))
+crawler_pages_per_job = int(os.getenv("CRAWLER_PAGES_PER_JOB", "0"))
+
+# Crawl state for resuming interrupted crawls and skipping unchanged posts (empty disables it)
+crawl_state_path = os.getenv("CRAWL_STATE_PATH", "crawl_state.sqlite3")
+
+# Pipeline: "batch" scrapes everything before analyzing it, "streaming" analyzes posts while
+# scraping, holding at most PIPELINE_MAX_PENDING posts and checkpointing the summaries as it goes
+pipeline_mode = os.getenv("PIPELINE_MODE", "batch")
+pipeline_max_pending = int(os.getenv("PIPELINE_MAX_PENDING", "64"))
+pipeline_checkpoint_path = os.getenv("PIPELINE_CHECKPOINT_PATH", "partial_report.json")
+
+# Near-duplicate posts (reposts, copies found under several keywords or cafes): posts whose Combined text
+# is at least NEAR_DUPLICATE_THRESHOLD similar (estimated Jaccard similarity of character shingles) are
+# summarized once, and each summary gives its group's size (0 disables)
+near_duplicate_threshold = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Waits: seconds to wait for a page to react, for late requests (comments) to settle after the
+# body appears (with NETWORK_IDLE_MS of network quiet), and for the login and any CAPTCHA
+wait_timeout = float(os.getenv("WAIT_TIMEOUT", "10"))
+network_idle_ms = int(os.getenv("NETWORK_IDLE_MS", "500"))
+network_idle_timeout = float(os.getenv("NETWORK_IDLE_TIMEOUT", "2"))
+login_timeout = float(os.getenv("LOGIN_TIMEOUT", "120"))
+
+# Session reuse: saved Naver cookies (empty disables), an optional Chrome profile directory for the
+# main browser, and the file caching the chromedriver path resolved by ChromeDriverManager
+naver_session_path = os.getenv("NAVER_SESSION_PATH", "naver_session.json")
+chrome_profile_dir = os.getenv("CHROME_PROFILE_DIR", "")
+chromedriver_cache_path = os.getenv("CHROMEDRIVER_CACHE_PATH", ".chromedriver_path")
+naver_session = NaverSession(naver_session_path, chrome_profile_dir or None)
+
+# Browser: "full" renders pages like a desktop browser, "lean" runs headless with a fixed
+# LEAN_WINDOW_SIZE viewport, a LEAN_CACHE_MB disk cache and images, media, fonts and ad scripts blocked
+browser_mode = os.getenv("BROWSER_MODE", "full")
+lean_window_size = tuple(int(size) for size in os.getenv("LEAN_WINDOW_SIZE", "1280,900").split(","))
+lean_cache_mb = int(os.getenv("LEAN_CACHE_MB", "64"))
+
+# Browser lifecycle: Chrome starts on first use, not at import, and a browser is restarted (keeping its
+# cookies) between result pages once it has opened BROWSER_RECYCLE_ARTICLES posts or its processes use
+# more than BROWSER_RECYCLE_RSS_MB (0 disables either limit)
+browser_recycle_articles = int(os.getenv("BROWSER_RECYCLE_ARTICLES", "500"))
+browser_recycle_rss_mb = int(os.getenv("BROWSER_RECYCLE_RSS_MB", "2048"))
+
+# Run metrics: spans and counters written to METRICS_PATH when the run ends (".prom" for Prometheus
+# text, JSON otherwise; empty disables), cProfile stats to PROFILE_PATH, console messages from LOG_LEVEL up
+metrics_path = os.getenv("METRICS_PATH", "run_metrics.json")
+profile_path = os.getenv("PROFILE_PATH", "")
+log_level = os.getenv("LOG_LEVEL", "INFO")
+
 # Set up WebDriver
-options = Options()
-options.add_argument("--disable-notifications")
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=options)
-driver.maximize_window()
+def create_driver(session=None):
+    options = Options()
+    options.add_argument("--disable-notifications")
+    if browser_mode == "lean":
+        configure_lean(options, lean_window_size, lean_cache_mb)
+    if session is not None:
+        session.configure(options)
+    service = Service(cached_driver_path(chromedriver_cache_path))
+    browser = webdriver.Chrome(service=service, options=options)
+    if browser_mode == "lean":
+        block_resources(browser)
+    else:
+        browser.maximize_window()
+    return instrument_driver(browser)
+
+def create_managed_driver(session=None, name="browser"):
+    return ManagedDriver(
+        lambda: create_driver(session), browser_recycle_articles, browser_recycle_rss_mb, name=name
+    )
+
+driver = create_managed_driver(naver_session)
 
+@timed("login")
 def login_to_naver():
     url = "https://nid.naver.com/nidlogin.login"
     driver.get(url)
@@ -35,171 +148,325 @@ def login_to_naver():
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "id")).send_keys(naver_marketing_id)
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "pw")).send_keys(naver_marketing_password)
         WebDriverWait(driver, 10).until(lambda d: d.find_element(By.ID, "log.login")).click()
-        time.sleep(20)  # Allow time for CAPTCHA
     except TimeoutException:
-        print("Login elements did not load in time.")
-
-def scrape_posts(search_keywords, start_page=1, end_page=11):
+        logger.warning("Login elements did not load in time.")
+        return
+    try:
+        # Returns as soon as the login page is left, leaving time to solve a CAPTCHA
+        wait_for_login(driver, login_timeout)
+    except TimeoutException:
+        logger.warning(f"Still on the login page after {login_timeout:.0f}s")
+
+def scrape_posts(search_keywords, start_page=1, end_page=11, article_fetcher=None, browser=None, crawl_summary=None,
+                 crawl_state=None, cafe_url=None, on_post=None, stop_event=None):
+    # With on_post set, every post is handed to it as soon as its page is done instead of being returned;
+    # once stop_event is set, the crawl stops before the next page and stays resumable
+    if browser is None:
+        browser = driver
+    if crawl_summary is None:
+        crawl_summary = {}
+    for key in ("pages_read", "pages_skipped", "posts_out_of_range", "posts_reused"):
+        crawl_summary.setdefault(key, 0)
     scraped_data = []
     filter_date = datetime(2024, 11, 1)  # Set the filter date to November 1, 2024
     keywords = [kw.strip() for kw in search_keywords.split(',')]  # Split keywords by comma
 
-    for keyword in keywords:
-        try:
-            search_input = WebDriverWait(driver, 10).until(
+    def open_search(keyword):
+        with span("search"):
+            search_input = WebDriverWait(browser, 10).until(
                 EC.presence_of_element_located((By.XPATH, '//input[@name="query"]'))
             )
             search_input.clear()
             search_input.send_keys(keyword)
 
-            search_button = WebDriverWait(driver, 10).until(
+            search_button = WebDriverWait(browser, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//button[@onclick="searchBoard();return false;"]'))
             )
+            previous_frame_url = cafe_frame_url(browser)
             search_button.click()
-            time.sleep(2)
+            wait_for_cafe_frame(browser, previous_frame_url, "search", wait_timeout)
 
-            # Switch to the required iframe
-            WebDriverWait(driver, 10).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main")))
+        # Switch to the required iframe
+        WebDriverWait(browser, 10).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main")))
 
-            for current_page in range(start_page, end_page + 1):
-                print(f"Scraping page {current_page} for keyword '{keyword}'...")
+    for keyword in keywords:
+        if stop_event is not None and stop_event.is_set():
+            break
+        try:
+            open_search(keyword)
+
+            first_page = start_page
+            if crawl_state is not None:
+                # Resume after the last completed page of an interrupted run of this keyword
+                first_page, resumed_posts = crawl_state.begin(cafe_url, keyword, start_page, end_page, f"{filter_date:%Y-%m-%d}~")
+                if on_post is not None:
+                    for item in resumed_posts:
+                        on_post(item)
+                else:
+                    scraped_data.extend(resumed_posts)
+            if 1 < first_page <= end_page:
+                go_to_page(browser, first_page)
+
+            error_stop = False
+            for current_page in range(first_page, end_page + 1):
+                if stop_event is not None and stop_event.is_set():
+                    logger.info(f"Stopping before page {current_page} for keyword '{keyword}': the crawl was interrupted")
+                    error_stop = True
+                    break
+                logger.info(f"Scraping page {current_page} for keyword '{keyword}'...")
 
                 try:
-                    post_elements = driver.find_elements(By.XPATH, '//a[contains(@class, "article")]')
-                    if not post_elements:
-                        print(f"No posts found on page {current_page} for keyword '{keyword}'")
+                    # Every row's title, date and link in one round-trip instead of per-row DOM queries
+                    rows = snapshot_list_page(browser)
+                    if not rows:
+                        logger.info(f"No posts found on page {current_page} for keyword '{keyword}'")
+                        break
+
+                    # Results are newest-first: once a whole page is before the filter date, so is every later page
+                    date_range = page_date_range(rows)
+                    if date_range is not None and date_range[1] < filter_date:
+                        crawl_summary["pages_skipped"] += end_page - current_page + 1
+                        logger.info(f"Stopping at page {current_page} for keyword '{keyword}': all posts are before the filter date")
                         break
 
-                    for j in range(len(post_elements)):
-                        post_elements = driver.find_elements(By.XPATH, '//a[contains(@class, "article")]')
+                    crawl_summary["pages_read"] += 1
+
+                    # Articles read over HTTP are collected per page and fetched together
+                    page_articles = []
+                    page_posts = []
+
+                    def add_post(row, date_text, title, content, comments, replies):
+                        item = {
+                            "Date": date_text,
+                            "Title": title,
+                            "Content": content,
+                            "Combined": f"{title} {content} " + " ".join(comments) + " " + " ".join(replies),
+                            "CafeId": row["cafe_id"],
+                            "ArticleId": row["article_id"]
+                        }
+                        page_posts.append(item)
+                        if crawl_state is not None:
+                            crawl_state.save_article(row["cafe_id"], row["article_id"], row["comment_count"], item)
+
+                    for row in rows:
+                        j = row["index"]
 
                         try:
-                            date_element_xpath = f'(//td[@class="td_date"])[{j+1}]'
-                            date_element = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, date_element_xpath))
-                            )
-                            date_text = date_element.text
-                            print(f"Post {j+1} has date: {date_text}")
+                            date_text = row["date"]
+                            if date_text is None:
+                                raise NoSuchElementException(f"No date cell for post {j+1}")
+                            logger.debug(f"Post {j+1} has date: {date_text}")
 
                             # Parse the date string to a datetime object
-                            post_date = datetime.strptime(date_text.strip(), "%Y.%m.%d.")
+                            post_date = parse_list_date(date_text)
                             
                             # Check if the post date is from November 2024 onwards
                             if post_date < filter_date:
-                                print(f"Skipping post {j+1} as it does not match the date filter (after November 2024)")
+                                logger.debug(f"Skipping post {j+1} as it does not match the date filter (after November 2024)")
+                                crawl_summary["posts_out_of_range"] += 1
                                 continue
 
-                            # Extract the title directly from the anchor tag or child elements
-                            post_element = post_elements[j]
-                            title = post_element.text.strip()
-                            print(f"Scraping post {j+1}: {title}")
-
-                            # Click and proceed
-                            post_element.click()
-                            WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, '//div[contains(@class, "se-main-container")]'))
-                            )
-                            time.sleep(2)
+                            title = row["title"]
 
-                            content_xpath = '//div[contains(@class, "se-main-container")]'
-                            content_element = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located((By.XPATH, content_xpath))
-                            )
-                            content = content_element.text
+                            if crawl_state is not None:
+                                stored_post = crawl_state.unchanged_article(row["cafe_id"], row["article_id"], row["comment_count"])
+                                if stored_post is not None:
+                                    logger.debug(f"Reusing post {j+1}: {title} (unchanged since the last crawl)")
+                                    page_posts.append(stored_post)
+                                    crawl_summary["posts_reused"] += 1
+                                    continue
 
-                            comments, replies = extract_comments()
+                            if article_fetcher is not None and row["article_id"] is not None:
+                                page_articles.append((row, date_text, title))
+                                continue
 
-                            scraped_data.append({
-                                "Date": date_text,
-                                "Title": title,
-                                "Content": content,
-                                "Combined": f"{title} {content} " + " ".join(comments) + " " + " ".join(replies)
-                            })
+                            logger.debug(f"Scraping post {j+1}: {title}")
 
-                            driver.back()
-                            WebDriverWait(driver, 10).until(
+                            # Click and proceed
+                            article_done(browser)
+                            with span("article_load"):
+                                post_element = browser.find_element(By.XPATH, f'(//a[contains(@class, "article")])[{j+1}]')
+                                post_element.click()
+                                timed_wait("article_open", browser, EC.presence_of_element_located(
+                                    (By.XPATH, '//div[contains(@class, "se-main-container")]')
+                                ), wait_timeout)
+                                # Comments load after the body
+                                wait_for_network_idle(browser, "article_settle", network_idle_ms, network_idle_timeout)
+                                record_page_load(browser, "article")
+
+                            if article_extract_mode == "script":
+                                # Body, comments and replies (all comment pages) in one script evaluation
+                                with span("comment_extraction"):
+                                    article = extract_article(browser, max_comment_pages=max_comment_pages)
+                                if article["content"] is None:
+                                    raise NoSuchElementException("se-main-container not found")
+                                content, comments, replies = article["content"], article["comments"], article["replies"]
+                                logger.debug(f"Extracted post {j+1} ({article['comment_pages']} comment pages) in {article['elapsed']:.2f}s")
+                            else:
+                                extract_start = time.perf_counter()
+                                content_xpath = '//div[contains(@class, "se-main-container")]'
+                                content_element = WebDriverWait(browser, 10).until(
+                                    EC.presence_of_element_located((By.XPATH, content_xpath))
+                                )
+                                content = content_element.text
+
+                                with span("comment_extraction"):
+                                    comments, replies = extract_comments(browser)
+                                record_timing("legacy", time.perf_counter() - extract_start)
+
+                            add_post(row, date_text, title, content, comments, replies)
+
+                            browser.back()
+                            WebDriverWait(browser, 10).until(
                                 EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, "iframe#cafe_main"))
                             )
 
-                        except (StaleElementReferenceException, TimeoutException, NoSuchElementException) as e:
-                            print(f"Error with post {j+1} on page {current_page}: {e}")
+                        except (StaleElementReferenceException, TimeoutException, NoSuchElementException, JavascriptException) as e:
+                            logger.warning(f"Error with post {j+1} on page {current_page}: {e}")
                             continue
 
+                    if page_articles:
+                        with span("article_fetch"):
+                            articles = article_fetcher.fetch_articles([(row["cafe_id"], row["article_id"]) for row, _, _ in page_articles])
+                        incr("articles_fetched", len(articles))
+                        for (row, date_text, title), article in zip(page_articles, articles):
+                            j = row["index"]
+                            if isinstance(article, Exception):
+                                logger.warning(f"Error fetching post {j+1} (article {row['article_id']}) on page {current_page}: {article}")
+                                continue
+                            logger.debug(f"Scraped post {j+1} over HTTP: {title}")
+                            add_post(row, date_text, title, article["content"], article["comments"], article["replies"])
+
+                    if on_post is not None:
+                        for item in page_posts:
+                            on_post(item)
+                    else:
+                        scraped_data.extend(page_posts)
+                    if crawl_state is not None:
+                        crawl_state.complete_page(cafe_url, keyword, start_page, current_page, page_posts)
+
+                    # A restarted browser repeats the search in the cafe and jumps straight to the next page
+                    if current_page < end_page and cafe_url is not None and recycle_if_needed(browser):
+                        browser.get(cafe_url)
+                        record_page_load(browser, "cafe")
+                        open_search(keyword)
+                        go_to_page(browser, current_page + 1)
+                        continue
+
                     next_page_link_xpath = f'//a[text()="{current_page + 1}"]'
                     try:
-                        next_page_element = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, next_page_link_xpath))
-                        )
-                        next_page_element.click()
-                        time.sleep(2)
+                        with span("page_navigation"):
+                            next_page_element = WebDriverWait(browser, 10).until(
+                                EC.element_to_be_clickable((By.XPATH, next_page_link_xpath))
+                            )
+                            previous_list = list_signature(browser)
+                            next_page_element.click()
+                            wait_for_list_change(browser, previous_list, "next_page", wait_timeout)
+                            record_page_load(browser, "list")
                     except (TimeoutException, NoSuchElementException) as e:
-                        print(f"No more pages or error clicking next page (page {current_page}): {e}")
+                        logger.info(f"No more pages or error clicking next page (page {current_page}): {e}")
                         break
 
                 except (TimeoutException, NoSuchElementException) as e:
-                    print(f"Error with scraping on page {current_page}: {e}")
+                    logger.warning(f"Error with scraping on page {current_page}: {e}")
+                    error_stop = True
                     break
 
+            # A crawl that stopped on an error stays resumable from its last completed page
+            if crawl_state is not None and not error_stop:
+                crawl_state.finish(cafe_url, keyword, start_page)
+
         except TimeoutException as e:
-            print(f"Error with initial search setup for keyword '{keyword}': {e}")
+            logger.error(f"Error with initial search setup for keyword '{keyword}': {e}")
 
+    logger.info(f"Crawl summary for '{search_keywords}' (pages {start_page}-{end_page}): {crawl_summary}")
     return scraped_data
 
-def extract_comments():
+def extract_comments(browser=None):
+    if browser is None:
+        browser = driver
+
     comments = []
     replies = []
 
     try:
-        comment_elements = driver.find_elements(By.XPATH, '//span[@class="text_comment"]')
+        comment_elements = browser.find_elements(By.XPATH, '//li[not(contains(@class,"CommentItem--reply"))]//span[@class="text_comment"]')
         comments = [element.text for element in comment_elements]
 
-        reply_elements = driver.find_elements(By.XPATH, '//li[contains(@class,"CommentItem--reply")]//span[@class="text_comment"]')
+        reply_elements = browser.find_elements(By.XPATH, '//li[contains(@class,"CommentItem--reply")]//span[@class="text_comment"]')
         replies = [element.text for element in reply_elements]
 
     except (TimeoutException, NoSuchElementException) as e:
-        print(f"Error extracting comments or replies: {e}")
+        logger.warning(f"Error extracting comments or replies: {e}")
 
     return comments, replies
 
-def analyze_with_gpt4(combined_texts):
-    client = OpenAI(api_key=OpenAI.api_key)
-    system_prompt = (
+analysis_system_prompt = (
         """당신은 감정 분석과 요약에 능통한 전문가입니다. 
         제공된 각 텍스트에 대해 감정 분류를 수행하세요.
         "원더캠프" 직접적으로 관련된 내용만을 사용하여 요약합니다.
         원더캠프가 들어가있는 글들만을 사용하여 요약합니다.
         (긍정적, 중립적, 부정적) 그리고 주요 포인트와 의견을 요약하여 
         간단한 요약을 제공합니다."""
-    )
+)
+
+def analyze_with_gpt4(combined_texts):
+    client = OpenAI(api_key=OpenAI.api_key)
     
     summaries = []
 
-    for text in combined_texts:
-        chat_completion = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ],
-            max_tokens=4096
-        )
-        summary = chat_completion.choices[0].message.content.strip()
-        summaries.append(summary)
+    rate_limiter = RateLimiter(llm_requests_per_minute or None, llm_tokens_per_minute or None)
+    cache = LLMCache(llm_cache_path, llm_cache_max_entries, llm_cache_max_age_days)
+    engine_kwargs = {"max_workers": llm_max_workers, "rate_limiter": rate_limiter, "cache": cache}
+    try:
+        with span("llm_analysis"):
+            if llm_mode == "packed":
+                results = run_packed_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, combined_texts, 4096, **engine_kwargs
+                )
+            else:
+                results = run_chunked_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, combined_texts, 4096,
+                    llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens, **engine_kwargs
+                )
+                logger.info(f"LLM tokens: {token_report(results)}")
+        logger.info(f"LLM cache: {cache.stats()}")
+    finally:
+        cache.close()
+    count_llm_results(results)
+
+    for result in results:
+        if result["error"] is not None:
+            logger.warning(f"Error during GPT-4o call: {result['error']}")
+            summaries.append("Error processing text")
+            continue
+        summaries.append(result["content"])
 
     return summaries
 
-def write_to_docx(summaries):
+@timed("docx_write")
+def write_to_docx(summaries, file_name='wonder_camp_summaries.docx', group_sizes=None):
     doc = docx.Document()
     doc.add_heading('원더캠프 의견 요약', 0)
 
-    for idx, summary in enumerate(summaries):
-        doc.add_paragraph(f"Post {idx+1} Summary:", style='Heading2')
-        doc.add_paragraph(summary)
-    
+    # A post standing for a near-duplicate group says how many posts the group holds
+    group_sizes = group_sizes or [1] * len(summaries)
+    headings = (
+        f"Post {idx+1} Summary ({size} near-duplicate posts):" if size > 1 else f"Post {idx+1} Summary:"
+        for idx, size in enumerate(group_sizes)
+    )
+
+    # Appended in one pass; doc.add_paragraph() slows down as the document grows
+    append_paragraphs(doc, (
+        paragraph
+        for heading, summary in zip(headings, summaries)
+        for paragraph in (('Heading 2', heading), (None, summary))
+    ))
+
     # Save in the current directory
-    file_path = os.path.join(os.getcwd(), 'wonder_camp_summaries.docx')
+    file_path = os.path.join(os.getcwd(), file_name)
     doc.save(file_path)
-    print(f"Document saved to {file_path}")
+    logger.info(f"Document saved to {file_path}")
 
 def main():
     cafe_urls = [
@@ -208,33 +475,115 @@ def main():
     ]
     search_keywords = "원더캠프"  # Add more keywords separated by commas
 
-    login_to_naver()  # Perform login once at the beginning
+    if pipeline_mode == "streaming" and llm_mode != "online":
+        raise ValueError("PIPELINE_MODE=streaming only supports LLM_MODE=online")
+
+    naver_session.ensure_login(driver, login_to_naver)  # Log in only when the saved session has expired
+
+    article_fetcher = ArticleFetcher.from_driver(driver) if article_fetch_mode == "http" else None
 
     all_data = []
+    crawl_state = CrawlState(crawl_state_path) if crawl_state_path else None
+
+    pipeline = None
+    if pipeline_mode == "streaming":
+        # Summarize posts as soon as their result page is scraped
+        client = OpenAI(api_key=OpenAI.api_key)
+        rate_limiter = RateLimiter(llm_requests_per_minute or None, llm_tokens_per_minute or None)
+        cache = LLMCache(llm_cache_path, llm_cache_max_entries, llm_cache_max_age_days)
+
+        def analyze_post(item):
+            with span("llm_post"):
+                result = run_chunked_chat_completions(
+                    client, "gpt-4o", analysis_system_prompt, [item["Combined"]], 4096,
+                    llm_max_input_tokens, llm_chunk_tokens, llm_chunk_summary_tokens,
+                    max_workers=llm_max_workers, rate_limiter=rate_limiter, cache=cache
+                )[0]
+            count_llm_results([result], stage="streaming")
+            return result
+
+        pipeline = StreamingPipeline(
+            analyze_post,
+            SummaryAggregator(),
+            max_workers=llm_max_workers,
+            max_pending=pipeline_max_pending,
+            checkpoint_path=pipeline_checkpoint_path or None,
+            near_duplicates=NearDuplicateIndex(near_duplicate_threshold) if near_duplicate_threshold > 0 else None
+        )
 
-    for idx, cafe_url in enumerate(cafe_urls):
-        # Open each URL in a new tab
-        if idx > 0:
-            driver.execute_script("window.open('');")
-            driver.switch_to.window(driver.window_handles[-1])
+    def scrape_job(browser, job):
+        # Navigate to the cafe in this worker's logged-in browser, in its one tab, on a fresh browser
+        # once the last one is over its limits
+        recycle_if_needed(browser)
+        browser.close_extra_tabs()
+        browser.get(job["cafe_url"])
+        record_page_load(browser, "cafe")
 
-        # Navigate to the new URL in an existing session
-        driver.get(cafe_url.strip())
-        
         # Scrape data
-        data = scrape_posts(search_keywords, start_page=1, end_page=3)
-        all_data.extend(data)
+        return scrape_posts(job["keyword"], start_page=job["start_page"], end_page=job["end_page"],
+                            article_fetcher=article_fetcher, browser=browser,
+                            crawl_state=crawl_state, cafe_url=job["cafe_url"],
+                            on_post=pipeline.submit if pipeline is not None else None, stop_event=pool.stop_event)
+
+    jobs = build_jobs(cafe_urls, [search_keywords], 1, 3, crawler_pages_per_job)
+    worker_drivers = [create_managed_driver(name=f"browser {number}") for number in range(1, crawler_workers)]
+    interrupted = False
+    crawled = False
+    try:
+        for worker_driver in worker_drivers:
+            copy_session(driver, worker_driver)
+        pool = CrawlerPool([driver] + worker_drivers, per_cafe_limit=crawler_per_cafe_limit)
+        for data in pool.run(jobs, scrape_job):
+            all_data.extend(data)
+        crawled = True
+    except KeyboardInterrupt:
+        if pipeline is None:
+            raise
+        interrupted = True
+        logger.info("Interrupted: writing partial summaries from the posts analyzed so far")
+    finally:
+        rss = browser_rss(started_drivers([driver] + worker_drivers))
+        if rss is not None:
+            logger.info(f"Browser RSS ({browser_mode} mode): {rss / 1024 / 1024:.0f} MB")
+        for worker_driver in worker_drivers:
+            worker_driver.quit()
+        if crawl_state is not None:
+            crawl_state.close()
+        # The streaming cache is closed whether the crawl finished, was interrupted or failed
+        if pipeline is not None:
+            try:
+                # Posts still queued when the crawl stopped early are dropped
+                pipeline.close(cancel_pending=not crawled)
+                logger.info(f"LLM cache: {cache.stats()}")
+            finally:
+                cache.close()
+
+    logger.info(f"Article extraction timings: {timing_summary()}")
+    logger.info(f"Wait timings per step: {wait_summary()}")
+    logger.info(f"Page load times ({browser_mode} mode): {page_load_summary()}")
+
+    if pipeline is not None:
+        posts, summaries = pipeline.aggregator.summaries()
+        write_to_docx(summaries, 'wonder_camp_summaries.partial.docx' if interrupted else 'wonder_camp_summaries.docx',
+                      [post["Duplicates"] for post in posts])
+        logger.info("Summaries have been generated and saved.")
+        return
+
+    if near_duplicate_threshold > 0:
+        # Only the first post of each near-duplicate group is summarized
+        all_data = group_near_duplicates(all_data, NearDuplicateIndex(near_duplicate_threshold), post_key)
 
     # Use GPT-4o to analyze sentiment and summarize
     combined_texts = [item["Combined"] for item in all_data]
     summaries = analyze_with_gpt4(combined_texts)
 
     # Write summaries to a docx file
-    write_to_docx(summaries)
-    print("Summaries have been generated and saved.")
+    write_to_docx(summaries, group_sizes=[item.get("Duplicates", 1) for item in all_data])
+    logger.info("Summaries have been generated and saved.")
 
 if __name__ == "__main__":
+    configure_logging(log_level)
     try:
-        main()
+        run_main(main, "Navercafe_research", metrics_path or None, profile_path or None)
     finally:
-        driver.quit()
\ No newline at end of file
+        driver.quit()
@@ -0,0 +1,104 @@
+import time
+from collections import defaultdict
+
+# Collects the body, comments and replies of the open article in one asynchronous script
+# evaluation. Comment pages ("더보기" buttons or numbered pages) are walked inside the browser,
+# up to arguments[0] pages, waiting at most arguments[1] ms for each page to render.
+ARTICLE_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const maxPages = arguments[0];
+const pageTimeout = arguments[1];
+
+const comments = [];
+const replies = [];
+const seen = new Set();
+
+function collect() {
+    document.querySelectorAll('li.CommentItem, li[class*="CommentItem"]').forEach((item, i) => {
+        const span = item.querySelector('span.text_comment');
+        if (!span) return;
+        const key = item.id || (item.dataset && item.dataset.commentId) || span.innerText + '#' + i;
+        if (seen.has(key)) return;
+        seen.add(key);
+        if (item.classList.contains('CommentItem--reply')) {
+            replies.push(span.innerText);
+        } else {
+            comments.push(span.innerText);
+        }
+    });
+}
+
+function nextPageButton(page) {
+    const more = document.querySelector('.comment_more, .CommentBox .btn_more, a.more_comment');
+    if (more && more.offsetParent !== null) return more;
+    for (const button of document.querySelectorAll('.ArticlePaginate button, .ArticlePaginate a')) {
+        if (button.innerText.trim() === String(page + 1)) return button;
+    }
+    return null;
+}
+
+function commentSignature() {
+    const items = document.querySelectorAll('li[class*="CommentItem"]');
+    return items.length + ':' + (items.length ? items[items.length - 1].innerText.length : 0)
+        + ':' + (items.length ? items[0].id : '');
+}
+
+function waitForChange(before, callback) {
+    const started = Date.now();
+    (function poll() {
+        if (commentSignature() !== before || Date.now() - started > pageTimeout) {
+            callback();
+        } else {
+            setTimeout(poll, 50);
+        }
+    })();
+}
+
+let page = 1;
+function step() {
+    collect();
+    const button = page < maxPages ? nextPageButton(page) : null;
+    if (!button) {
+        const body = document.querySelector('div[class*="se-main-container"]');
+        done({content: body ? body.innerText : null, comments: comments, replies: replies, comment_pages: page});
+        return;
+    }
+    const before = commentSignature();
+    button.click();
+    page += 1;
+    waitForChange(before, step);
+}
+step();
+"""
+
+# Seconds spent extracting each article, per extraction path, for comparing the two
+extraction_timings = defaultdict(list)
+
+
+def extract_article(driver, max_comment_pages=10, page_timeout=5):
+    """
+    Returns {"content", "comments", "replies", "comment_pages", "elapsed"} for the open article.
+
+    content is None when the page has no se-main-container. Replies are not repeated in comments.
+    """
+    driver.set_script_timeout(page_timeout * max_comment_pages + 10)
+    start = time.perf_counter()
+    payload = driver.execute_async_script(ARTICLE_SCRIPT, max_comment_pages, int(page_timeout * 1000))
+    payload["elapsed"] = time.perf_counter() - start
+    extraction_timings["script"].append(payload["elapsed"])
+    return payload
+
+
+def record_timing(path, elapsed):
+    extraction_timings[path].append(elapsed)
+
+
+def timing_summary():
+    """
+    Returns {path: {"articles", "mean", "max"}} over every article extracted so far.
+    """
+    return {
+        path: {"articles": len(values), "mean": sum(values) / len(values), "max": max(values)}
+        for path, values in extraction_timings.items()
+        if values
+    }
@@ -0,0 +1,143 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+NAVER_API_BASE = "https://apis.naver.com"
+ARTICLE_PATH = "/cafe-web/cafe-articleapi/v2.1/cafes/{cafe_id}/articles/{article_id}"
+COMMENTS_PATH = "/cafe-web/cafe-articleapi/v2/cafes/{cafe_id}/articles/{article_id}/comments/pages/{page}"
+
+
+def parse_article_href(href):
+    """
+    Returns (cafe_id, article_id) from a search result link, or None if the link has neither form.
+    """
+    if not href:
+        return None
+    parsed = urlparse(href)
+    query = {key.lower(): values[0] for key, values in parse_qs(parsed.query).items()}
+    if "clubid" in query and "articleid" in query:
+        return query["clubid"], query["articleid"]
+    match = re.search(r"/cafes/(\d+)/articles/(\d+)", parsed.path + "#" + parsed.fragment)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+def html_to_text(content_html):
+    # One line per paragraph, like the rendered se-main-container text Selenium returns
+    if not content_html or not content_html.strip():
+        return ""
+    root = lxml_html.fromstring(content_html)
+    containers = root.xpath('//div[contains(@class, "se-main-container")]') or [root]
+    paragraphs = containers[0].xpath(".//p")
+    if paragraphs:
+        lines = [paragraph.text_content().strip() for paragraph in paragraphs]
+    else:
+        lines = [text.strip() for text in containers[0].itertext()]
+    return "\n".join(line for line in lines if line)
+
+
+class ArticleFetcher:
+    """
+    Fetches article bodies and comments straight from the cafe article API over a pooled
+    HTTP session, instead of opening every post in the browser.
+
+    Selenium is still used for login and search; from_driver() copies its session cookies.
+    """
+
+    def __init__(self, cookies=None, user_agent=None, api_base=NAVER_API_BASE, pool_size=16,
+                 timeout=10, max_comment_pages=20):
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self.max_comment_pages = max_comment_pages
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Referer"] = "https://cafe.naver.com/"
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        for cookie in cookies or []:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        return cls(cookies=driver.get_cookies(), user_agent=user_agent, **kwargs)
+
+    def _get_json(self, path):
+        response = self.session.get(self.api_base + path, timeout=self.timeout)
+        response.raise_for_status()
+        return json.loads(response.content)
+
+    def _split_comments(self, items, comments, replies):
+        for item in items:
+            text = (item.get("content") or "").strip()
+            if not text:
+                continue
+            if item.get("isRef"):
+                replies.append(text)
+            else:
+                comments.append(text)
+
+    def fetch_article(self, cafe_id, article_id):
+        """
+        Returns {"title", "content", "comments", "replies"} for one article.
+
+        Comments are top-level comments only; replies are listed separately.
+        """
+        payload = self._get_json(ARTICLE_PATH.format(cafe_id=cafe_id, article_id=article_id))
+        # Deleted or blocked posts come back with null fields
+        result = payload.get("result") or payload
+        article = result.get("article") or {}
+        first_comments = result.get("comments") or {}
+
+        comments = []
+        replies = []
+        self._split_comments(first_comments.get("items") or [], comments, replies)
+
+        # The article response only carries the first comment page
+        page = 2
+        has_next = first_comments.get("hasNext", False)
+        while has_next and page <= self.max_comment_pages:
+            page_payload = self._get_json(COMMENTS_PATH.format(cafe_id=cafe_id, article_id=article_id, page=page))
+            page_comments = (page_payload.get("result") or page_payload).get("comments") or {}
+            items = page_comments.get("items") or []
+            self._split_comments(items, comments, replies)
+            has_next = bool(items) and page_comments.get("hasNext", False)
+            page += 1
+
+        return {
+            "title": (article.get("subject") or "").strip(),
+            "content": html_to_text(article.get("contentHtml") or ""),
+            "comments": comments,
+            "replies": replies,
+        }
+
+    def fetch_articles(self, refs, max_workers=None):
+        """
+        Fetches (cafe_id, article_id) pairs concurrently and returns the results in input order.
+
+        A failed article is returned as the exception raised while fetching it.
+        """
+        def fetch(ref):
+            try:
+                return self.fetch_article(*ref)
+            except (requests.RequestException, ValueError, KeyError, AttributeError, TypeError) as e:
+                return e
+
+        if not refs:
+            return []
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            return list(executor.map(fetch, refs))
+
+    def close(self):
+        self.session.close()
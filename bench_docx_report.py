@@ -0,0 +1,95 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+from docx_report import write_summary_report
+
+
+def legacy_write(product_count, category_count, sentiment_count, total_posts, all_data, summaries, output_file):
+    # The row-by-row, paragraph-by-paragraph writer write_summary_to_docx used before docx_report
+    doc = Document()
+    doc.add_heading('Sentiment Analysis Summary', level=1)
+    for heading, header, counts in (
+        ('Product Mentions', ('Product', 'Count'), product_count),
+        ('Category Mentions', ('Category', 'Total Mentions'), category_count),
+    ):
+        doc.add_heading(heading, level=2)
+        table = doc.add_table(rows=1, cols=2)
+        table.style = 'Table Grid'
+        hdr_cells = table.rows[0].cells
+        hdr_cells[0].text, hdr_cells[1].text = header
+        for name in sorted(counts):
+            row_cells = table.add_row().cells
+            row_cells[0].text = name
+            row_cells[1].text = str(counts[name])
+    doc.add_heading('Sentiment Analysis', level=2)
+    table = doc.add_table(rows=1, cols=2)
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text, hdr_cells[1].text = 'Sentiment', 'Count'
+    for sentiment, count in sentiment_count.items():
+        row_cells = table.add_row().cells
+        row_cells[0].text = sentiment
+        row_cells[1].text = str(count)
+    doc.add_heading('Overview', level=2)
+    table = doc.add_table(rows=1, cols=2)
+    table.style = 'Table Grid'
+    row_cells = table.add_row().cells
+    row_cells[0].text = 'Total Posts'
+    row_cells[1].text = str(total_posts)
+    doc.add_heading('Detailed Summaries', level=2)
+    for item, summary in zip(all_data, summaries):
+        doc.add_heading(f"Title: {item['Title']}", level=3)
+        doc.add_paragraph(summary)
+        doc.add_paragraph("\n")
+    doc.save(output_file)
+
+
+def make_report(num_posts, num_products=2000, seed=0):
+    rng = random.Random(seed)
+    words = ["텐트", "설치", "좋아요", "바람", "튼튼", "가격", "KZM", "캠핑", "타프", "의자", "아쉬워요", "추천"]
+    product_count = {f"KZM 제품 {number}": rng.randint(1, 50) for number in range(num_products)}
+    category_count = {f"카테고리 {number}": rng.randint(1, 500) for number in range(40)}
+    sentiment_count = {'positive': num_posts // 2, 'neutral': num_posts // 4, 'negative': num_posts - num_posts // 2 - num_posts // 4}
+    all_data = [{"Title": f"캠핑 후기 {number}", "Date": "2024-11-01 12:00"} for number in range(num_posts)]
+    summaries = [
+        "감정: 긍정적\n요약: " + " ".join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+        for _ in range(num_posts)
+    ]
+    return product_count, category_count, sentiment_count, num_posts, all_data, summaries
+
+
+def measure(write, *args):
+    start = time.perf_counter()
+    write(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    # bench_docx_report.py [posts] [max posts per file] [legacy]
+    num_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    max_posts_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    run_legacy = len(sys.argv) > 3 and sys.argv[3] == "legacy"
+
+    report = make_report(num_posts)
+    print(f"{num_posts} posts, {len(report[0])} products")
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, "report.docx")
+        if run_legacy:
+            legacy_elapsed = measure(legacy_write, *report, output_file)
+            print(f"row-by-row writer: {legacy_elapsed:.2f}s")
+
+        elapsed = measure(write_summary_report, *report, output_file, max_posts_per_file, ("csv", "html"))
+        sizes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"bulk writer:       {elapsed:.2f}s, {len(os.listdir(directory))} files, "
+              f"{sizes / 1024 / 1024:.1f} MB on disk")
+        if run_legacy:
+            print(f"speedup: {legacy_elapsed / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+
+from product_matcher import ProductMatcher
+
+
+def legacy_count(all_data, product_category_mapping):
+    # The per-post regex loop analyze_with_gpt4o used before ProductMatcher
+    product_count = defaultdict(int)
+    category_count = defaultdict(int)
+    for item in all_data:
+        text = item["Combined"]
+        mentioned_products = set()
+        for product, category in product_category_mapping.items():
+            product_regex = re.compile(re.escape(product.replace(" ", "")), re.IGNORECASE)
+            if product_regex.search(text.replace(" ", "")) and product not in mentioned_products:
+                mentioned_products.add(product)
+                product_count[product] += 1
+                category_count[category] += 1
+    return dict(product_count), dict(category_count)
+
+
+def matcher_count(all_data, product_category_mapping):
+    product_count = defaultdict(int)
+    category_count = defaultdict(int)
+    matcher = ProductMatcher(product_category_mapping)
+    for item in all_data:
+        matcher.count_mentions(item["Combined"], product_count, category_count)
+    return dict(product_count), dict(category_count)
+
+
+def make_corpus(num_products, num_posts, seed=0):
+    rng = random.Random(seed)
+    syllables = "카즈미캠핑텐트타프의자테이블랜턴버너코펠침낭매트쉘터"
+    categories = ["텐트", "타프", "체어", "테이블", "랜턴", "버너", "침낭", "매트"]
+
+    product_category_mapping = {}
+    while len(product_category_mapping) < num_products:
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(3, 6)))
+        name = f"KZM {name} {rng.randint(1, 999)}"
+        product_category_mapping[name] = rng.choice(categories)
+
+    products = list(product_category_mapping)
+    all_data = []
+    for _ in range(num_posts):
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5))) for _ in range(80)]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(products))
+        all_data.append({"Combined": " ".join(words)})
+    return product_category_mapping, all_data
+
+
+def main():
+    num_products = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_posts = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    product_category_mapping, all_data = make_corpus(num_products, num_posts)
+    print(f"{num_products} products, {num_posts} posts")
+
+    start = time.perf_counter()
+    legacy = legacy_count(all_data, product_category_mapping)
+    legacy_elapsed = time.perf_counter() - start
+    print(f"regex loop:     {legacy_elapsed:.3f}s")
+
+    start = time.perf_counter()
+    matched = matcher_count(all_data, product_category_mapping)
+    matcher_elapsed = time.perf_counter() - start
+    print(f"ProductMatcher: {matcher_elapsed:.3f}s ({legacy_elapsed / matcher_elapsed:.1f}x)")
+
+    if legacy != matched:
+        print("Mismatch between regex loop and ProductMatcher counts")
+        sys.exit(1)
+    print("Counts match.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import argparse
+import html
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from article_fetcher import ArticleFetcher
+from browser_profile import browser_rss
+from fake_openai_server import start_fake_openai_server
+from fixture_server import start_fixture_server
+from metrics import configure_logging
+from waits import wait_timings
+
+try:
+    import resource
+except ImportError:  # Windows; peak memory then comes from psutil
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # Peak memory is not reported on Windows without psutil
+    psutil = None
+
+CAFE_ID = "10050146"
+KEYWORD = "카즈미"
+
+# Offline replay of a whole report run: a generated cafe (search form, result pages, article
+# and comment API responses) is served by fixture_server and GPT-4o by fake_openai_server, and
+# Marketing_report's scrape_posts, analyze_with_gpt4o and write_summary_to_docx run against them.
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>replay cafe</title></head>
+<body>
+<input name="query" type="text">
+<button onclick="searchBoard();return false;">검색</button>
+<iframe id="cafe_main" name="cafe_main" src="/cafe/home.html" width="100%" height="800"></iframe>
+<script>
+function searchBoard() {
+    const query = encodeURIComponent(document.querySelector('input[name="query"]').value);
+    document.getElementById('cafe_main').src = '/cafe/list?search.page=1&query=' + query;
+}
+</script>
+</body></html>
+"""
+
+LIST_HTML = """<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"></head>
+<body>
+<table>
+{rows}
+</table>
+<div class="prev-next">{pages}</div>
+</body></html>
+"""
+
+
+def make_corpus(num_posts, num_products=500, seed=0):
+    rng = random.Random(seed)
+    syllables = "카즈미캠핑텐트타프의자테이블랜턴버너코펠침낭매트쉘터"
+    categories = ["텐트", "타프", "체어", "테이블", "랜턴", "버너", "침낭", "매트"]
+    opinions = ["설치가 쉬워요", "바람에 튼튼합니다", "가격이 아쉬워요", "추천합니다", "별로였어요", "그냥 무난해요"]
+
+    product_category_mapping = {}
+    while len(product_category_mapping) < num_products:
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(3, 6)))
+        product_category_mapping[f"KZM {name} {rng.randint(1, 999)}"] = rng.choice(categories)
+    products = list(product_category_mapping)
+
+    posts = []
+    newest = datetime(2024, 11, 30)
+    for number in range(num_posts):
+        sentences = [rng.choice(opinions) for _ in range(rng.randint(3, 30))]
+        for _ in range(rng.randint(0, 3)):
+            sentences.insert(rng.randrange(len(sentences)), f"{rng.choice(products)} 샀습니다")
+        comments = [
+            {"content": rng.choice(opinions), "isRef": rng.random() < 0.3} for _ in range(rng.randint(0, 12))
+        ]
+        posts.append({
+            "article_id": 100000 + number,
+            "title": f"{KEYWORD} 후기 {number}",
+            # Newest first, like the search result list
+            "date": newest - timedelta(minutes=number * 30),
+            "sentences": sentences,
+            "comments": comments,
+        })
+    return product_category_mapping, posts
+
+
+def write_fixtures(directory, posts, rows_per_page=50):
+    """
+    Writes the cafe page, every search result page and every article API response under directory.
+    """
+    os.makedirs(os.path.join(directory, "cafe", "list"), exist_ok=True)
+    with open(os.path.join(directory, "cafe", "index.html"), "w", encoding="utf-8") as f:
+        f.write(INDEX_HTML)
+    with open(os.path.join(directory, "cafe", "home.html"), "w", encoding="utf-8") as f:
+        f.write('<!DOCTYPE html><html><body><p>home</p></body></html>')
+
+    num_pages = max(1, -(-len(posts) // rows_per_page))
+    for page in range(1, num_pages + 1):
+        rows = []
+        for post in posts[(page - 1) * rows_per_page:page * rows_per_page]:
+            href = f"/cafe/read/{post['article_id']}.html?clubid={CAFE_ID}&articleid={post['article_id']}"
+            rows.append(
+                f'<tr><td><a class="article" href="{href}">{html.escape(post["title"])}</a>'
+                f'<span class="cmt">[{len(post["comments"])}]</span></td>'
+                f'<td class="td_date">{post["date"]:%Y.%m.%d.}</td></tr>'
+            )
+        # Page links of the current block of ten, and "다음" to the next block
+        block_start = (page - 1) // 10 * 10 + 1
+        links = [
+            f'<a href="/cafe/list?search.page={number}">{number}</a>'
+            for number in range(block_start, min(block_start + 10, num_pages + 1)) if number != page
+        ]
+        if block_start + 10 <= num_pages:
+            links.append(f'<a class="pgR" href="/cafe/list?search.page={block_start + 10}">'
+                         f'<span class="m-tcol-c">다음</span></a>')
+        with open(os.path.join(directory, "cafe", "list", f"{page}.html"), "w", encoding="utf-8") as f:
+            f.write(LIST_HTML.format(rows="\n".join(rows), pages=" ".join(links)))
+
+    articles_dir = os.path.join(directory, "cafe-web", "cafe-articleapi", "v2.1", "cafes", CAFE_ID, "articles")
+    os.makedirs(articles_dir, exist_ok=True)
+    for post in posts:
+        content_html = '<div class="se-main-container">' + "".join(
+            f'<p class="se-text-paragraph"><span>{html.escape(sentence)}</span></p>' for sentence in post["sentences"]
+        ) + "</div>"
+        payload = {"result": {
+            "cafeId": int(CAFE_ID),
+            "articleId": post["article_id"],
+            "article": {"id": post["article_id"], "subject": post["title"], "contentHtml": content_html,
+                        "commentCount": len(post["comments"])},
+            "comments": {"items": post["comments"], "hasNext": False},
+        }}
+        with open(os.path.join(articles_dir, f"{post['article_id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+    return num_pages
+
+
+def fake_responder(request):
+    # A prose answer of the usual shape, with the sentiment marker the report counts
+    user_text = request["messages"][-1]["content"]
+    sentiment = ["긍정적", "중립적", "부정적"][len(user_text) % 3]
+    return (
+        f"1. 제품 언급: {user_text[:60]}\n2. 카테고리 언급: 텐트 1회\n"
+        f"3. 감정 분석: 사용 경험을 공유하는 글입니다.\n감정: {sentiment}"
+    )
+
+
+class TimedArticleFetcher(ArticleFetcher):
+    # Records how long each article (body and comment pages) took to fetch
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def fetch_article(self, cafe_id, article_id):
+        start = time.perf_counter()
+        try:
+            return super().fetch_article(cafe_id, article_id)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {"n": len(values), "p50_ms": pick(0.5) * 1000, "p90_ms": pick(0.9) * 1000,
+            "p99_ms": pick(0.99) * 1000, "max_ms": values[-1] * 1000}
+
+
+def peak_rss_mb():
+    if resource is not None:
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    return 0.0
+
+
+def run_replay(report, llm_server, num_posts, args, work_dir):
+    product_category_mapping, posts = make_corpus(num_posts, seed=args.seed)
+    fixtures_dir = os.path.join(work_dir, f"fixtures-{num_posts}")
+    num_pages = write_fixtures(fixtures_dir, posts, args.rows_per_page)
+
+    fixture_server = start_fixture_server(fixtures_dir, latency=args.page_latency)
+    base_url = f"http://127.0.0.1:{fixture_server.server_address[1]}"
+    llm_server.latencies.clear()
+    fetcher = TimedArticleFetcher(api_base=base_url, pool_size=args.fetch_workers)
+    result = {"posts": num_posts, "pages": num_pages}
+    try:
+        start = time.perf_counter()
+        report.driver.get(f"{base_url}/cafe/index.html")
+        all_data = report.scrape_posts(
+            KEYWORD, 1, num_pages, article_fetcher=fetcher, browser=report.driver,
+            cafe_url=f"{base_url}/cafe/index.html"
+        )
+        result["scrape_s"] = time.perf_counter() - start
+        result["scraped_posts"] = len(all_data)
+        result["scrape_peak_rss_mb"] = peak_rss_mb()
+
+        start = time.perf_counter()
+        summaries, product_count, category_count, sentiment_count, total_posts = report.analyze_with_gpt4o(
+            all_data, product_category_mapping
+        )
+        result["analyze_s"] = time.perf_counter() - start
+        result["analyze_peak_rss_mb"] = peak_rss_mb()
+
+        start = time.perf_counter()
+        report.write_summary_to_docx(
+            product_count, category_count, sentiment_count, total_posts, all_data, summaries,
+            os.path.join(work_dir, f"summary_results-{num_posts}.docx")
+        )
+        result["docx_s"] = time.perf_counter() - start
+        result["docx_peak_rss_mb"] = peak_rss_mb()
+    finally:
+        fetcher.close()
+        fixture_server.shutdown()
+
+    total = result["scrape_s"] + result["analyze_s"] + result["docx_s"]
+    result["posts_per_s"] = result["scraped_posts"] / total if total else None
+    result["latency"] = {
+        "list_page": percentiles(wait_timings["next_page"] + wait_timings["next_block"]),
+        "article_fetch": percentiles(fetcher.latencies),
+        "llm_request": percentiles(list(llm_server.latencies)),
+    }
+    result["browser_rss_mb"] = (browser_rss([report.driver]) or 0) / 1024 / 1024
+    # The wait timings are module-level; start the next corpus size from zero
+    wait_timings.clear()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a whole report run offline against recorded pages and a fake LLM")
+    parser.add_argument("posts", nargs="*", type=int, default=[100, 1000, 10000], help="corpus sizes to run")
+    parser.add_argument("--rows-per-page", type=int, default=50)
+    parser.add_argument("--page-latency", type=float, default=0.0, help="seconds per fixture response")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds per completion token")
+    parser.add_argument("--fetch-workers", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the scripts' own output")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    # The scripts report progress through logging; only warnings are shown unless --verbose
+    configure_logging("INFO" if args.verbose else "WARNING")
+
+    llm_server = start_fake_openai_server(
+        latency=args.llm_latency, token_latency=args.token_latency, responder=fake_responder
+    )
+    work_dir = tempfile.mkdtemp(prefix="replay-")
+    # Marketing_report reads its settings at import: point it at the fake API, a fresh LLM cache,
+    # a headless browser, and keep the real session, crawl state and corpus store out of the run
+    os.environ.update({
+        "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_server.server_address[1]}/v1",
+        "LLM_CACHE_PATH": os.path.join(work_dir, "llm_cache.sqlite3"),
+        "LLM_REQUESTS_PER_MINUTE": "0",
+        "LLM_TOKENS_PER_MINUTE": "0",
+        "BROWSER_MODE": os.environ.get("BROWSER_MODE", "lean"),
+        "NAVER_SESSION_PATH": "",
+        "CRAWL_STATE_PATH": "",
+        "CORPUS_STORE_PATH": "",
+        "REPORT_COMPANIONS": "",
+    })
+    import Marketing_report as report
+
+    results = []
+    try:
+        for num_posts in args.posts:
+            result = run_replay(report, llm_server, num_posts, args, work_dir)
+            results.append(result)
+            print(f"{num_posts} posts ({result['pages']} pages): {result['posts_per_s']:.1f} posts/s, "
+                  f"scrape {result['scrape_s']:.1f}s, analyze {result['analyze_s']:.1f}s, docx {result['docx_s']:.1f}s, "
+                  f"peak RSS {result['docx_peak_rss_mb']:.0f} MB (browser {result['browser_rss_mb']:.0f} MB)")
+            for stage, latency in result["latency"].items():
+                if latency:
+                    print(f"  {stage:>13}: n={latency['n']} p50 {latency['p50_ms']:.1f}ms, "
+                          f"p90 {latency['p90_ms']:.1f}ms, p99 {latency['p99_ms']:.1f}ms, max {latency['max_ms']:.1f}ms")
+    finally:
+        report.driver.quit()
+        llm_server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
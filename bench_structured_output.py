@@ -0,0 +1,64 @@
+import json
+import random
+import sys
+
+from openai import OpenAI
+
+from fake_openai_server import start_fake_openai_server
+from llm_chunking import run_chunked_chat_completions
+from llm_structured import output_savings, run_structured_chat_completions
+
+SYSTEM_PROMPT = "당신은 감정 분석과 마케팅에 유능한 전문가입니다. 주어진 텍스트의 제품 언급과 감정을 분석하세요."
+
+
+def fake_responder(request):
+    # Prose answers are the length GPT-4o typically writes for a post; structured ones are the compact object
+    user_text = request["messages"][-1]["content"]
+    sentiment = ["positive", "neutral", "negative"][len(user_text) % 3]
+    if "response_format" in request:
+        return json.dumps({"sentiment": sentiment, "summary": user_text[:40], "products": ["KZM 텐트"]},
+                          ensure_ascii=False)
+    return (
+        "1. 제품 언급: KZM 텐트가 1회 언급되었습니다.\n2. 카테고리 언급: 텐트 카테고리가 1회 언급되었습니다.\n"
+        f"3. 감정 분석: 글쓴이는 제품의 설치 편의성과 내구성에 대해 이야기하고 있습니다. {user_text[:200]}\n"
+        "감정: 긍정적\n요약: 전반적으로 제품에 대한 경험을 공유하며 다른 사용자들에게 참고가 될 만한 의견을 남겼습니다."
+    )
+
+
+def make_posts(num_posts, seed=0):
+    rng = random.Random(seed)
+    words = ["텐트", "설치", "좋아요", "바람", "튼튼", "가격", "KZM", "캠핑", "타프", "의자", "아쉬워요", "추천"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(50, 300))) for _ in range(num_posts)]
+
+
+def main():
+    num_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    use_api = len(sys.argv) > 2 and sys.argv[2] == "api"
+
+    server = None
+    if use_api:
+        client = OpenAI()
+    else:
+        # About 20ms per completion token, roughly GPT-4o's generation speed
+        server = start_fake_openai_server(responder=fake_responder, latency=0.05, token_latency=0.02)
+        client = OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+
+    texts = make_posts(num_posts)
+    print(f"{num_posts} posts against {'the OpenAI API' if use_api else 'the fake server'}")
+    try:
+        prose = run_chunked_chat_completions(client, "gpt-4o", SYSTEM_PROMPT, texts, 8192, max_workers=8)
+        structured = run_structured_chat_completions(client, "gpt-4o", SYSTEM_PROMPT, texts, 256, max_workers=8)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    savings = output_savings(prose, structured)
+    print(f"prose:      {savings['baseline']}")
+    print(f"structured: {savings['structured']}")
+    if "completion_tokens_saved_per_post" in savings:
+        print(f"saved per post: {savings['completion_tokens_saved_per_post']:.0f} completion tokens, "
+              f"{savings['latency_saved_per_post_s']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
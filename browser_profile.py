@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+try:
+    import psutil
+except ImportError:  # Browser RSS is only reported when psutil is installed
+    psutil = None
+
+# Requests the lean profile never makes: images, media, fonts, and the ad/tracking
+# scripts on cafe pages. Patterns use the "*" wildcard of Network.setBlockedURLs.
+LEAN_BLOCKED_URLS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.bmp*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*phinf.pstatic.net*", "*video-phinf*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*", "*google-analytics.com*",
+    "*adcr.naver.com*", "*veta.naver.com*", "*wcs.naver.net*", "*lcs.naver.com*", "*nelo2-col*",
+]
+
+# Milliseconds from navigation start to the load event of each document, per kind of page
+page_load_timings = defaultdict(list)
+
+# Load time of the current document (the frame's, inside an iframe), or null while it is still loading
+PAGE_LOAD_SCRIPT = """
+const entry = performance.getEntriesByType('navigation')[0];
+return entry && entry.loadEventEnd > 0 ? entry.loadEventEnd - entry.startTime : null;
+"""
+
+
+def configure_lean(options, window_size=(1280, 900), cache_mb=64):
+    """
+    Headless Chrome with a fixed small viewport, a capped disk cache and no images.
+    """
+    options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={window_size[0]},{window_size[1]}")
+    options.add_argument(f"--disk-cache-size={cache_mb * 1024 * 1024}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--mute-audio")
+    options.add_argument("--disable-extensions")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+
+
+def block_resources(driver, patterns=LEAN_BLOCKED_URLS):
+    # Applies to every document the tab loads from now on, including the cafe_main iframe
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def record_page_load(driver, kind):
+    load_ms = driver.execute_script(PAGE_LOAD_SCRIPT)
+    if load_ms is not None:
+        page_load_timings[kind].append(load_ms)
+    return load_ms
+
+
+def page_load_summary():
+    """
+    Returns {kind: {"pages", "mean_ms", "max_ms"}} over every page load recorded so far.
+    """
+    return {
+        kind: {"pages": len(values), "mean_ms": sum(values) / len(values), "max_ms": max(values)}
+        for kind, values in page_load_timings.items()
+        if values
+    }
+
+
+def browser_rss(drivers):
+    """
+    Returns the resident memory in bytes of the chromedriver processes of drivers and every
+    browser process they started, or None without psutil.
+    """
+    if psutil is None:
+        return None
+    total = 0
+    for driver in drivers:
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            continue
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue  # Renderer processes come and go
+    return total
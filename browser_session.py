@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Redirects to the login page unless the browser holds a valid Naver login
+SESSION_CHECK_URL = "https://nid.naver.com/user2/help/myInfoV2?lang=ko_KR"
+LOGIN_COOKIES = ("NID_AUT", "NID_SES")
+
+
+def cached_driver_path(cache_path=".chromedriver_path"):
+    """
+    Returns the chromedriver path resolved by ChromeDriverManager, reusing the one saved in
+    cache_path while that file still exists, so startup needs no network lookup.
+    """
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            path = f.read().strip()
+        if path and os.path.exists(path):
+            return path
+
+    # Imported here so a cached path needs neither webdriver_manager nor the network
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    if cache_path:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            f.write(path)
+    return path
+
+
+def add_cookies(driver, cookies):
+    """
+    Adds cookies to the browser, which must already be on their domain. Expired cookies are skipped.
+    """
+    now = time.time()
+    for cookie in cookies:
+        cookie = {key: value for key, value in cookie.items() if key in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")}
+        if cookie.get("expiry") is not None and cookie["expiry"] < now:
+            continue
+        try:
+            driver.add_cookie(cookie)
+        except Exception as e:
+            logger.warning(f"Could not add cookie {cookie['name']}: {e}")
+
+
+class NaverSession:
+    """
+    Keeps the Naver login between runs.
+
+    Cookies are saved to session_path after a successful login and restored on the next run;
+    with profile_dir, Chrome also keeps its own user-data profile there. The interactive
+    login only runs when neither gives a valid session.
+    """
+
+    def __init__(self, session_path="naver_session.json", profile_dir=None):
+        self.session_path = session_path
+        self.profile_dir = profile_dir
+
+    def configure(self, options):
+        # A profile can only be open in one Chrome at a time, so only the main browser gets it
+        if self.profile_dir:
+            options.add_argument(f"--user-data-dir={os.path.abspath(self.profile_dir)}")
+
+    def is_logged_in(self, driver):
+        cookie_names = {cookie["name"] for cookie in driver.get_cookies()}
+        if not cookie_names.intersection(LOGIN_COOKIES):
+            driver.get("https://www.naver.com/")
+            cookie_names = {cookie["name"] for cookie in driver.get_cookies()}
+            if not cookie_names.intersection(LOGIN_COOKIES):
+                return False
+        driver.get(SESSION_CHECK_URL)
+        return "nidlogin" not in driver.current_url
+
+    def restore(self, driver):
+        """
+        Loads the saved cookies into the browser and returns whether they give a valid login.
+        """
+        if self.profile_dir and self.is_logged_in(driver):
+            return True
+        if not self.session_path or not os.path.exists(self.session_path):
+            return False
+        with open(self.session_path, encoding="utf-8") as f:
+            cookies = json.load(f)
+        driver.get("https://www.naver.com/")
+        add_cookies(driver, cookies)
+        return self.is_logged_in(driver)
+
+    def save(self, driver):
+        if not self.session_path:
+            return
+        driver.get("https://www.naver.com/")
+        cookies = [cookie for cookie in driver.get_cookies() if "naver.com" in cookie.get("domain", "")]
+        # The file holds login tokens, so it is readable by the owner only
+        fd = os.open(self.session_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+
+    def ensure_login(self, driver, login):
+        """
+        Reuses the saved session if it is still valid, otherwise calls login() and saves the new one.
+        """
+        if self.restore(driver):
+            logger.info("Reusing the saved Naver session")
+            return True
+        logger.info("No valid saved session, logging in")
+        login()
+        if not self.is_logged_in(driver):
+            logger.warning("Login did not succeed; the session was not saved")
+            return False
+        self.save(driver)
+        return True
@@ -0,0 +1,201 @@
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from list_page import parse_list_date
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed when the corpus store is enabled
+    pa = None
+    ds = None
+    pq = None
+
+
+def _schema():
+    return pa.schema([
+        ("run_id", pa.string()),
+        ("cafe", pa.string()),
+        ("month", pa.string()),
+        ("cafe_url", pa.string()),
+        ("cafe_id", pa.string()),
+        ("article_id", pa.string()),
+        ("keyword", pa.string()),
+        ("date", pa.timestamp("s")),
+        ("title", pa.string()),
+        ("content", pa.string()),
+        ("comments", pa.list_(pa.string())),
+        ("replies", pa.list_(pa.string())),
+        ("summary", pa.string()),
+        ("sentiment", pa.string()),
+        ("products", pa.list_(pa.string())),
+        ("input_tokens", pa.int64()),
+        ("prompt_tokens", pa.float64()),
+        ("completion_tokens", pa.float64()),
+        ("stored_at", pa.timestamp("s")),
+    ])
+
+
+def cafe_name(item):
+    # Partition directory for a post: the cafe's URL name, else its numeric id
+    match = re.search(r"cafe\.naver\.com/([^/?#]+)", item.get("CafeUrl") or "")
+    name = match.group(1) if match else str(item.get("CafeId") or "unknown")
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name)
+
+
+def parse_post_date(date_text):
+    # Marketing_report stores "YYYY-MM-DD HH:MM"; Navercafe_research keeps the list's own text
+    if not date_text:
+        return None
+    try:
+        return datetime.strptime(date_text, "%Y-%m-%d %H:%M")
+    except ValueError:
+        pass
+    try:
+        return parse_list_date(date_text)
+    except ValueError:
+        return None
+
+
+class CorpusStore:
+    """
+    Scraped posts and their analysis as a Parquet dataset partitioned by cafe and month.
+
+    add() takes the same (item, entry, summary) a SummaryAggregator passes to its sink, so
+    posts are stored as they are analyzed; rows are written every flush_rows posts and on
+    close(). Each run adds new files; load() keeps the latest row of every post.
+    """
+
+    def __init__(self, root="corpus", run_id=None, flush_rows=500):
+        if pa is None:
+            raise RuntimeError("The corpus store needs pyarrow (pip install pyarrow)")
+        self.root = root
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.flush_rows = flush_rows
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def add(self, item, entry, summary):
+        date = parse_post_date(item.get("Date"))
+        row = {
+            "run_id": self.run_id,
+            "cafe": cafe_name(item),
+            "month": f"{date:%Y-%m}" if date else "unknown",
+            "cafe_url": item.get("CafeUrl"),
+            "cafe_id": str(item["CafeId"]) if item.get("CafeId") is not None else None,
+            "article_id": str(item["ArticleId"]) if item.get("ArticleId") is not None else None,
+            "keyword": item.get("Keyword"),
+            "date": date,
+            "title": item["Title"],
+            "content": item.get("Content"),
+            "comments": item.get("Comments") or [],
+            "replies": item.get("Replies") or [],
+            "summary": summary,
+            "sentiment": entry.get("Sentiment"),
+            "products": entry.get("Products") or [],
+            "input_tokens": entry.get("InputTokens"),
+            "prompt_tokens": entry.get("PromptTokens"),
+            "completion_tokens": entry.get("CompletionTokens"),
+            "stored_at": datetime.now(),
+        }
+        with self._lock:
+            self._rows.append(row)
+            rows = self._take_rows() if len(self._rows) >= self.flush_rows else None
+        if rows:
+            self._write(rows)
+
+    def _take_rows(self):
+        rows = self._rows
+        self._rows = []
+        return rows
+
+    def _write(self, rows):
+        table = pa.Table.from_pylist(rows, schema=_schema())
+        pq.write_to_dataset(
+            table, self.root, partition_cols=["cafe", "month"],
+            basename_template=f"{self.run_id}-{uuid.uuid4().hex}-{{i}}.parquet"
+        )
+
+    def flush(self):
+        with self._lock:
+            rows = self._take_rows()
+        if rows:
+            self._write(rows)
+
+    def close(self):
+        self.flush()
+
+    def load(self, start_date=None, end_date=None, cafes=None, keywords=None, columns=None):
+        """
+        Returns the stored posts as a DataFrame, one row per post (its latest analysis).
+
+        start_date and end_date ("YYYY-MM-DD", inclusive) and cafes prune whole partitions
+        before any file is read.
+        """
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+        # Partition values are read as strings, so a numeric cafe id stays comparable to "12345"
+        dataset = ds.dataset(self.root, format="parquet", partitioning=ds.partitioning(
+            pa.schema([("cafe", pa.string()), ("month", pa.string())]), flavor="hive"
+        ))
+        condition = None
+        for expression in (
+            ds.field("month") >= f"{start:%Y-%m}" if start is not None else None,
+            ds.field("month") <= end_date[:7] if end is not None else None,
+            ds.field("cafe").isin(list(cafes)) if cafes else None,
+        ):
+            if expression is not None:
+                condition = expression if condition is None else condition & expression
+        if columns is not None:
+            columns = sorted(set(columns) | {"cafe_id", "article_id", "title", "date", "keyword", "stored_at"})
+
+        df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+        if start is not None:
+            df = df[df["date"] >= start]
+        if end is not None:
+            df = df[df["date"] < end]
+        if keywords:
+            df = df[df["keyword"].isin(keywords)]
+
+        # The same post may be stored by several runs (or keywords); keep its latest row
+        key = ("id:" + df["cafe_id"].fillna("") + "/" + df["article_id"]).where(
+            df["article_id"].notna(), "title:" + df["title"]
+        )
+        df = df.assign(post_key=key).sort_values("stored_at").drop_duplicates("post_key", keep="last")
+        return df.sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def aggregate(df, product_category_mapping):
+    """
+    The report's counts over stored posts, like tally_results:
+    (summaries, product_count, category_count, sentiment_count, total_posts).
+    """
+    products = df["products"].explode().dropna()
+    categories = products.map(product_category_mapping).dropna()
+    sentiment_count = {'positive': 0, 'neutral': 0, 'negative': 0}
+    sentiment_count.update({label: int(count) for label, count in df["sentiment"].value_counts().items()})
+    return (
+        df["summary"].fillna("").tolist(),
+        {product: int(count) for product, count in products.value_counts().items()},
+        {category: int(count) for category, count in categories.value_counts().items()},
+        sentiment_count,
+        len(df),
+    )
+
+
+def report_posts(df):
+    # The Title/Date/Sentiment/Products records the report writers need
+    return [
+        {
+            "Title": title,
+            "Date": f"{date:%Y-%m-%d %H:%M}" if pd.notna(date) else None,
+            "Sentiment": sentiment if isinstance(sentiment, str) else None,
+            "Products": list(products) if products is not None else [],
+        }
+        for title, date, sentiment, products in zip(df["title"], df["date"], df["sentiment"], df["products"])
+    ]
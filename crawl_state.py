@@ -0,0 +1,158 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def post_key(item):
+    # Articles are identified by (cafe id, article id); posts read without an id fall back to their title
+    if item.get("ArticleId"):
+        return (str(item.get("CafeId")), str(item["ArticleId"]))
+    return ("title", item["Title"])
+
+
+class CrawlState:
+    """
+    Persistent crawl state in SQLite, so an interrupted crawl resumes where it stopped.
+
+    - articles: every scraped post by (cafe_id, article_id), with its comment count
+      from the result list and the scraped data, so unchanged posts are not fetched again.
+    - cursors: the last completed page per (cafe_url, keyword, start_page) job, and the
+      posts that job has collected in its current run.
+    """
+
+    def __init__(self, path="crawl_state.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                cafe_id TEXT NOT NULL,
+                article_id TEXT NOT NULL,
+                title TEXT,
+                comment_count INTEGER,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (cafe_id, article_id)
+            );
+            CREATE TABLE IF NOT EXISTS cursors (
+                cafe_url TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                start_page INTEGER NOT NULL,
+                end_page INTEGER NOT NULL,
+                date_filter TEXT,
+                last_completed_page INTEGER,
+                finished INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (cafe_url, keyword, start_page)
+            );
+            CREATE TABLE IF NOT EXISTS cursor_posts (
+                cafe_url TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                start_page INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (cafe_url, keyword, start_page, seq)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def begin(self, cafe_url, keyword, start_page, end_page, date_filter=None):
+        """
+        Starts or resumes the job and returns (first_page, posts_already_collected).
+
+        An unfinished cursor with the same page range and date filter is resumed after
+        its last completed page; anything else starts the job over.
+        """
+        job = (cafe_url, keyword, start_page)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT end_page, date_filter, last_completed_page, finished FROM cursors "
+                "WHERE cafe_url = ? AND keyword = ? AND start_page = ?",
+                job,
+            ).fetchone()
+            if row and not row[3] and row[0] == end_page and row[1] == date_filter and row[2]:
+                posts = [
+                    json.loads(data)
+                    for (data,) in self._conn.execute(
+                        "SELECT data FROM cursor_posts WHERE cafe_url = ? AND keyword = ? AND start_page = ? ORDER BY seq",
+                        job,
+                    )
+                ]
+                logger.info(f"Resuming '{keyword}' in {cafe_url} after page {row[2]} with {len(posts)} posts already collected")
+                return row[2] + 1, posts
+
+            self._conn.execute("DELETE FROM cursor_posts WHERE cafe_url = ? AND keyword = ? AND start_page = ?", job)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?, ?, NULL, 0, ?)",
+                job + (end_page, date_filter, time.time()),
+            )
+            self._conn.commit()
+        return start_page, []
+
+    def unchanged_article(self, cafe_id, article_id, comment_count):
+        """
+        Returns the stored data of an article whose comment count has not changed, or None.
+        """
+        if not article_id or comment_count is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT comment_count, data FROM articles WHERE cafe_id = ? AND article_id = ?",
+                (str(cafe_id), str(article_id)),
+            ).fetchone()
+        if row is None or row[0] != comment_count:
+            return None
+        return json.loads(row[1])
+
+    def save_article(self, cafe_id, article_id, comment_count, item):
+        if not article_id:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                (str(cafe_id), str(article_id), item["Title"], comment_count,
+                 json.dumps(item, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def complete_page(self, cafe_url, keyword, start_page, page, posts):
+        """
+        Records that page is done and appends the posts collected on it, in one transaction.
+        """
+        job = (cafe_url, keyword, start_page)
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) FROM cursor_posts WHERE cafe_url = ? AND keyword = ? AND start_page = ?",
+                job,
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO cursor_posts VALUES (?, ?, ?, ?, ?)",
+                [job + (seq + offset, json.dumps(item, ensure_ascii=False)) for offset, item in enumerate(posts, 1)],
+            )
+            self._conn.execute(
+                "UPDATE cursors SET last_completed_page = ?, updated_at = ? "
+                "WHERE cafe_url = ? AND keyword = ? AND start_page = ?",
+                (page, time.time()) + job,
+            )
+            self._conn.commit()
+
+    def finish(self, cafe_url, keyword, start_page):
+        job = (cafe_url, keyword, start_page)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cursors SET finished = 1, updated_at = ? WHERE cafe_url = ? AND keyword = ? AND start_page = ?",
+                (time.time(),) + job,
+            )
+            self._conn.execute("DELETE FROM cursor_posts WHERE cafe_url = ? AND keyword = ? AND start_page = ?", job)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
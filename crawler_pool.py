@@ -0,0 +1,120 @@
+import logging
+import threading
+from collections import defaultdict
+
+from browser_session import add_cookies
+
+logger = logging.getLogger(__name__)
+
+
+def split_page_range(start_page, end_page, pages_per_job):
+    """
+    Splits start_page..end_page into consecutive (start, end) ranges of at most pages_per_job pages.
+    """
+    if not pages_per_job or pages_per_job <= 0:
+        return [(start_page, end_page)]
+    return [
+        (page, min(page + pages_per_job - 1, end_page))
+        for page in range(start_page, end_page + 1, pages_per_job)
+    ]
+
+
+def build_jobs(cafe_urls, keywords, start_page, end_page, pages_per_job=0):
+    """
+    One job per (keyword, cafe, page range), in the order the serial loop would visit them.
+    """
+    return [
+        {"keyword": keyword, "cafe_url": cafe_url.strip(), "start_page": first, "end_page": last}
+        for keyword in keywords
+        for cafe_url in cafe_urls
+        for first, last in split_page_range(start_page, end_page, pages_per_job)
+    ]
+
+
+def copy_session(source_driver, target_driver, url="https://www.naver.com/"):
+    # Cookies can only be set for the domain the target browser is on
+    cookies = source_driver.get_cookies()
+    target_driver.get(url)
+    add_cookies(target_driver, cookies)
+
+
+class CrawlerPool:
+    """
+    Runs crawl jobs on several browsers at once.
+
+    Each worker thread owns one driver and takes the next job whose cafe is below
+    per_cafe_limit concurrent jobs (0 or less: no limit). Results come back in job order, whatever order
+    the workers finished in, so merging them is deterministic.
+
+    On Ctrl+C, stop_event is set: workers take no new job, scrapers given stop_event stop
+    after their current page, and run() waits for every worker before raising
+    KeyboardInterrupt, so the caller can clean up once no browser is in use.
+    """
+
+    def __init__(self, drivers, per_cafe_limit=1):
+        self.drivers = list(drivers)
+        self.per_cafe_limit = per_cafe_limit
+        self.stop_event = threading.Event()
+        self._condition = threading.Condition()
+        self._active_per_cafe = defaultdict(int)
+
+    def stop(self):
+        with self._condition:
+            self.stop_event.set()
+            self._condition.notify_all()
+
+    def _next_job(self, pending):
+        with self._condition:
+            while pending and not self.stop_event.is_set():
+                for position, (index, job) in enumerate(pending):
+                    if self.per_cafe_limit <= 0 or self._active_per_cafe[job["cafe_url"]] < self.per_cafe_limit:
+                        del pending[position]
+                        self._active_per_cafe[job["cafe_url"]] += 1
+                        return index, job
+                self._condition.wait()
+            return None
+
+    def _finish_job(self, job):
+        with self._condition:
+            self._active_per_cafe[job["cafe_url"]] -= 1
+            self._condition.notify_all()
+
+    def run(self, jobs, scrape_job):
+        """
+        Calls scrape_job(driver, job) for every job and returns the results in job order.
+
+        A job that raises is reported and returns an empty list.
+        """
+        pending = list(enumerate(jobs))
+        results = [[] for _ in jobs]
+
+        def worker(worker_id, driver):
+            while True:
+                next_job = self._next_job(pending)
+                if next_job is None:
+                    return
+                index, job = next_job
+                logger.info(f"[worker {worker_id}] {job['keyword']} in {job['cafe_url']} pages {job['start_page']}-{job['end_page']}")
+                try:
+                    results[index] = scrape_job(driver, job)
+                except Exception as e:
+                    logger.exception(f"[worker {worker_id}] Job {index} failed: {e}")
+                finally:
+                    self._finish_job(job)
+
+        threads = [
+            threading.Thread(target=worker, args=(worker_id, driver), daemon=True)
+            for worker_id, driver in enumerate(self.drivers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            logger.info("Interrupted: waiting for the workers to finish their current page")
+            self.stop()
+            for thread in threads:
+                thread.join()
+            raise
+        return results
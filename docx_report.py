@@ -0,0 +1,184 @@
+import csv
+import html
+import logging
+import os
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.table import _Cell
+
+logger = logging.getLogger(__name__)
+
+
+def add_table(doc, header, rows, style='Table Grid'):
+    """
+    Adds a table with all its rows at once.
+
+    The rows are created by a single add_table() call and filled cell by cell, instead of
+    table.add_row() and row.cells per row, which recompute the whole table each time.
+    """
+    rows = [header] + list(rows) if header is not None else list(rows)
+    table = doc.add_table(rows=len(rows), cols=len(rows[0]) if rows else 1)
+    table.style = style
+    for tr, values in zip(table._tbl.tr_lst, rows):
+        for tc, value in zip(tr.tc_lst, values):
+            _Cell(tc, table).text = str(value)
+    return table
+
+
+def _set_run_text(r, text):
+    # CT_R.text translates the text one character at a time; only line breaks occur in summaries
+    if "\t" in text or "\r" in text:
+        r.text = text
+        return
+    for number, line in enumerate(text.split("\n")):
+        if number:
+            r.append(OxmlElement("w:br"))
+        if line:
+            t = OxmlElement("w:t")
+            t.text = line
+            t.set(qn("xml:space"), "preserve")
+            r.append(t)
+
+
+def append_paragraphs(doc, paragraphs):
+    """
+    Appends (style name or None, text) paragraphs to the end of the document.
+
+    doc.add_paragraph() and doc.add_heading() look up the style by name and search the body
+    for the section properties on every call; here both are done once, so appending
+    tens of thousands of paragraphs takes linear time.
+    """
+    body = doc.element.body
+    sect_pr = body.sectPr
+    style_ids = {}
+    for style_name, text in paragraphs:
+        p = OxmlElement("w:p")
+        if style_name is not None:
+            if style_name not in style_ids:
+                style_ids[style_name] = doc.styles[style_name].style_id
+            p_style = OxmlElement("w:pStyle")
+            p_style.set(qn("w:val"), style_ids[style_name])
+            p_pr = OxmlElement("w:pPr")
+            p_pr.append(p_style)
+            p.append(p_pr)
+        if text:
+            _set_run_text(p.add_r(), text)
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
+
+
+def post_heading(item):
+    # Posts standing for a near-duplicate group say how many posts the group holds
+    duplicates = item.get("Duplicates") or 1
+    if duplicates > 1:
+        return f"Title: {item['Title']} ({duplicates} near-duplicate posts)"
+    return f"Title: {item['Title']}"
+
+
+def post_paragraphs(all_data, summaries):
+    for item, summary in zip(all_data, summaries):
+        # The post title as a heading, then its summary and a blank line
+        yield 'Heading 3', post_heading(item)
+        yield None, summary
+        yield None, "\n"
+
+
+def summary_tables(product_count, category_count, sentiment_count, total_posts):
+    # (heading, header, rows) of the report's count tables, products and categories alphabetically
+    return [
+        ('Product Mentions', ('Product', 'Count'),
+         [(product, product_count[product]) for product in sorted(product_count)]),
+        ('Category Mentions', ('Category', 'Total Mentions'),
+         [(category, category_count[category]) for category in sorted(category_count)]),
+        ('Sentiment Analysis', ('Sentiment', 'Count'), list(sentiment_count.items())),
+        ('Overview', None, [('Total Posts', total_posts)]),
+    ]
+
+
+def part_path(output_file, number):
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.part{number}{ext}"
+
+
+def write_summary_report(product_count, category_count, sentiment_count, total_posts, all_data, summaries,
+                         output_file, max_posts_per_file=0, companions=()):
+    """
+    Writes the report DOCX: the count tables, then the title and summary of every post.
+
+    With max_posts_per_file, the detailed summaries are split so that each DOCX holds at most
+    that many posts; the first file keeps output_file's name and the rest are saved as
+    "<name>.part2.docx", ... Each document is saved and released before the next is built.
+    companions may include "csv" (one row per post) and "html" (the whole report in one
+    page), written next to output_file. Returns the paths written.
+    """
+    tables = summary_tables(product_count, category_count, sentiment_count, total_posts)
+    all_data = list(all_data)
+    summaries = list(summaries)
+    per_file = max_posts_per_file if max_posts_per_file > 0 else max(len(all_data), 1)
+    num_files = max(1, -(-len(all_data) // per_file))
+
+    paths = []
+    for number in range(1, num_files + 1):
+        doc = Document()
+        if number == 1:
+            doc.add_heading('Sentiment Analysis Summary', level=1)
+            for heading, header, rows in tables:
+                doc.add_heading(heading, level=2)
+                add_table(doc, header, rows)
+            doc.add_heading('Detailed Summaries', level=2)
+        else:
+            doc.add_heading(f'Detailed Summaries ({number}/{num_files})', level=2)
+        start = (number - 1) * per_file
+        append_paragraphs(doc, post_paragraphs(all_data[start:start + per_file], summaries[start:start + per_file]))
+        path = output_file if number == 1 else part_path(output_file, number)
+        doc.save(path)
+        paths.append(path)
+        logger.info(f"Results saved to {path}")
+
+    root, _ = os.path.splitext(output_file)
+    if "csv" in companions:
+        paths.append(write_summary_csv(all_data, summaries, f"{root}.csv"))
+    if "html" in companions:
+        paths.append(write_summary_html(tables, all_data, summaries, f"{root}.html"))
+    return paths
+
+
+def write_summary_csv(all_data, summaries, path):
+    # utf-8-sig so Excel opens the Korean text correctly
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Title", "Date", "Sentiment", "Products", "Duplicates", "Summary"])
+        for item, summary in zip(all_data, summaries):
+            writer.writerow([
+                item["Title"], item.get("Date") or "", item.get("Sentiment") or "",
+                ", ".join(item.get("Products") or []), item.get("Duplicates") or 1, summary,
+            ])
+    logger.info(f"Results saved to {path}")
+    return path
+
+
+def write_summary_html(tables, all_data, summaries, path):
+    # Written line by line, so the page never has to be held in memory
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<!DOCTYPE html>\n<html lang="ko">\n<head><meta charset="utf-8">'
+                '<title>Sentiment Analysis Summary</title>\n'
+                '<style>table{border-collapse:collapse}td,th{border:1px solid #999;padding:2px 8px}</style>'
+                '</head>\n<body>\n<h1>Sentiment Analysis Summary</h1>\n')
+        for heading, header, rows in tables:
+            f.write(f"<h2>{html.escape(heading)}</h2>\n<table>\n")
+            if header is not None:
+                f.write("<tr>" + "".join(f"<th>{html.escape(str(value))}</th>" for value in header) + "</tr>\n")
+            for row in rows:
+                f.write("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>\n")
+            f.write("</table>\n")
+        f.write("<h2>Detailed Summaries</h2>\n")
+        for item, summary in zip(all_data, summaries):
+            f.write(f"<h3>{html.escape(post_heading(item))}</h3>\n"
+                    f"<p>{html.escape(summary).replace(chr(10), '<br>')}</p>\n")
+        f.write("</body>\n</html>\n")
+    logger.info(f"Results saved to {path}")
+    return path
@@ -0,0 +1,145 @@
+import logging
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from browser_profile import browser_rss
+from browser_session import add_cookies
+from metrics import incr
+
+logger = logging.getLogger(__name__)
+
+
+class ManagedDriver:
+    """
+    Stands in for a Chrome WebDriver that is started on first use and can be restarted.
+
+    Attribute access is passed to the real driver, so a ManagedDriver can be used wherever
+    the scripts use a driver; the first access starts Chrome through factory(). Importing a
+    module that holds one therefore starts nothing.
+
+    Scrapers call article_done() for every post opened in the browser and recycle_if_needed()
+    at points where they can resume on a fresh browser. The browser is then replaced once
+    it has opened max_articles posts or its processes use more than max_rss_mb (checked every
+    rss_check_every posts, with psutil); 0 disables either limit. Cookies are carried over
+    to the new browser, so the Naver login survives a restart.
+    """
+
+    def __init__(self, factory, max_articles=0, max_rss_mb=0, rss_check_every=20,
+                 cookie_url="https://www.naver.com/", name="browser"):
+        self._factory = factory
+        self._driver = None
+        self._lock = threading.RLock()
+        self.max_articles = max_articles
+        self.max_rss_mb = max_rss_mb
+        self.rss_check_every = rss_check_every
+        self.cookie_url = cookie_url
+        self.name = name
+        self.articles = 0
+        self.restarts = 0
+        self._rss_checked_at = 0
+
+    @property
+    def started(self):
+        return self._driver is not None
+
+    @property
+    def driver(self):
+        with self._lock:
+            if self._driver is None:
+                logger.info(f"Starting {self.name}")
+                self._driver = self._factory()
+                incr("browser_starts")
+            return self._driver
+
+    def __getattr__(self, name):
+        # Only reached for attributes ManagedDriver does not define itself
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.driver, name)
+
+    def article_done(self):
+        self.articles += 1
+
+    def _recycle_reason(self):
+        if self._driver is None:
+            return None
+        if self.max_articles and self.articles >= self.max_articles:
+            return f"{self.articles} posts opened"
+        if self.max_rss_mb and self.articles - self._rss_checked_at >= self.rss_check_every:
+            self._rss_checked_at = self.articles
+            rss = browser_rss([self._driver])
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                return f"{rss / 1024 / 1024:.0f} MB resident"
+        return None
+
+    def recycle(self, reason="requested"):
+        """
+        Quits the browser and starts a new one with the old one's cookies.
+        """
+        with self._lock:
+            cookies = []
+            if self._driver is not None:
+                try:
+                    cookies = self._driver.get_cookies()
+                except WebDriverException as e:
+                    logger.warning(f"Could not read the cookies of {self.name} before restarting it: {e}")
+            self.quit()
+            logger.info(f"Restarting {self.name} ({reason})")
+            self.restarts += 1
+            incr("browser_recycles")
+            if cookies:
+                # Cookies can only be set for the domain the browser is on
+                self.driver.get(self.cookie_url)
+                add_cookies(self._driver, cookies)
+            return self.driver
+
+    def recycle_if_needed(self):
+        """
+        Recycles the browser if it is over one of its limits; returns whether it did.
+        """
+        reason = self._recycle_reason()
+        if reason is None:
+            return False
+        self.recycle(reason)
+        return True
+
+    def close_extra_tabs(self):
+        """
+        Closes every tab but the first, so a job always runs in the browser's one tab.
+        """
+        if self._driver is None:
+            return
+        handles = self._driver.window_handles
+        for handle in handles[1:]:
+            self._driver.switch_to.window(handle)
+            self._driver.close()
+        if len(handles) > 1:
+            self._driver.switch_to.window(handles[0])
+
+    def quit(self):
+        with self._lock:
+            if self._driver is None:
+                return
+            driver, self._driver = self._driver, None
+            self.articles = 0
+            self._rss_checked_at = 0
+            try:
+                driver.quit()
+            except WebDriverException as e:
+                logger.warning(f"Error quitting {self.name}: {e}")
+
+
+def article_done(browser):
+    # Scrapers also accept plain WebDriver instances, which are never recycled
+    if isinstance(browser, ManagedDriver):
+        browser.article_done()
+
+
+def recycle_if_needed(browser):
+    return isinstance(browser, ManagedDriver) and browser.recycle_if_needed()
+
+
+def started_drivers(drivers):
+    # The browsers that are running: measuring an unstarted ManagedDriver would start it
+    return [driver for driver in drivers if not isinstance(driver, ManagedDriver) or driver.started]
@@ -0,0 +1,135 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI chat completions endpoint.
+# Point the scripts at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        started = time.perf_counter()
+        with server.lock:
+            server.request_count += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            time.sleep(server.latency)
+
+            roll = server.random.random()
+            if roll < server.rate_limit_rate:
+                self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit_error"}},
+                                {"retry-after": str(server.retry_after)})
+                return
+            if roll < server.rate_limit_rate + server.error_rate:
+                self._send_json(500, {"error": {"message": "server error", "type": "server_error"}})
+                return
+
+            content = server.responder(request)
+            prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 2
+            completion_tokens = len(content) // 2
+            # Generation time grows with the answer, as it does for the real API
+            time.sleep(server.token_latency * completion_tokens)
+            with server.lock:
+                server.latencies.append(time.perf_counter() - started)
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{server.request_count}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "gpt-4o"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def default_responder(request):
+    user_text = request["messages"][-1]["content"]
+    sentiment = ["긍정적", "중립적", "부정적"][len(user_text) % 3]
+    return f"요약: {user_text[:40]}\n감정: {sentiment}"
+
+
+def start_fake_openai_server(host="127.0.0.1", port=0, latency=0.0, rate_limit_rate=0.0,
+                             error_rate=0.0, retry_after=1, responder=default_responder, seed=0, token_latency=0.0):
+    """
+    Starts the fake server on a background thread and returns it; server.server_address
+    holds the bound port and server.shutdown() stops it.
+
+    Every answer takes latency seconds plus token_latency seconds per completion token;
+    server.latencies records how long each successful answer took.
+    """
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.token_latency = token_latency
+    server.rate_limit_rate = rate_limit_rate
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.responder = responder
+    server.random = random.Random(seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.latencies = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 500")
+    args = parser.parse_args()
+
+    server = start_fake_openai_server(args.host, args.port, args.latency, args.rate_limit_rate, args.error_rate)
+    host, port = server.server_address
+    print(f"Fake OpenAI server listening on http://{host}:{port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
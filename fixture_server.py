@@ -0,0 +1,94 @@
+import argparse
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Local stand-in for the Naver endpoints, serving saved responses from a fixtures directory.
+# A request for /a/b is answered with fixtures/a/b, fixtures/a/b.json, fixtures/a/b.html
+# or fixtures/a/b/index.html, whichever exists first. A search result page requested as
+# /a/b?search.page=N is answered with fixtures/a/b/N.html.
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self, path, query=""):
+        root = self.server.fixtures_dir
+        base = os.path.normpath(os.path.join(root, unquote(path).lstrip("/")))
+        if not base.startswith(os.path.normpath(root)):
+            return None
+        candidates = [base, base + ".json", base + ".html", os.path.join(base, "index.html")]
+        page = parse_qs(query).get("search.page")
+        if page and page[0].isdigit():
+            candidates.insert(0, os.path.join(base, f"{int(page[0])}.html"))
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlparse(self.path)
+        file_path = self._resolve(url.path, url.query)
+        if file_path is None:
+            body = b"not found"
+            self.send_response(404)
+            content_type = "text/plain"
+        else:
+            with open(file_path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/json":
+                content_type += "; charset=utf-8"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fixture_server(fixtures_dir="fixtures", host="127.0.0.1", port=0, latency=0.0):
+    """
+    Starts the fixture server on a background thread and returns it; the base URL is
+    http://host:server.server_address[1].
+    """
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.fixtures_dir = os.path.abspath(fixtures_dir)
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved Naver cafe fixtures over HTTP")
+    parser.add_argument("--fixtures", default="fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    args = parser.parse_args()
+
+    server = start_fixture_server(args.fixtures, args.host, args.port, args.latency)
+    host, port = server.server_address
+    print(f"Serving {args.fixtures} on http://{host}:{port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import re
+from datetime import datetime
+
+from article_fetcher import parse_article_href
+from waits import timed_wait
+
+# Reads every search result row in one WebDriver round-trip. Links and dates are paired
+# by position, like the (//td[@class="td_date"])[j+1] lookup the row loop used to do.
+LIST_PAGE_SCRIPT = """
+const links = document.querySelectorAll('a[class*="article"]');
+const dates = document.querySelectorAll('td[class="td_date"]');
+const rows = [];
+for (let i = 0; i < links.length; i++) {
+    const tr = links[i].closest('tr');
+    const counter = tr ? tr.querySelector('.cmt, .comment_count, em.num') : null;
+    const count = counter ? parseInt(counter.innerText.replace(/[^0-9]/g, ''), 10) : NaN;
+    rows.push({
+        index: i,
+        title: links[i].innerText.trim(),
+        href: links[i].href,
+        date: i < dates.length ? dates[i].innerText.trim() : null,
+        comment_count: isNaN(count) ? null : count
+    });
+}
+return rows;
+"""
+
+
+def snapshot_list_page(driver):
+    """
+    Returns the rows of the current search result page as dicts with
+    index, title, href, date, comment_count, cafe_id and article_id.
+    """
+    rows = driver.execute_script(LIST_PAGE_SCRIPT) or []
+    for row in rows:
+        article_ref = parse_article_href(row["href"])
+        row["cafe_id"], row["article_id"] = article_ref if article_ref else (None, None)
+    return rows
+
+
+def go_to_page(driver, page, timeout=10):
+    """
+    Loads the given page of the current search result list directly, via its search.page parameter.
+    """
+    previous = driver.execute_script("return location.href;")
+    # Edited as a string: the search query may be EUC-KR encoded, which URLSearchParams would re-encode
+    driver.execute_script(
+        "const href = location.href;"
+        "location.href = /[?&]search\\.page=\\d+/.test(href)"
+        "    ? href.replace(/([?&]search\\.page=)\\d+/, '$1' + arguments[0])"
+        "    : href + (href.includes('?') ? '&' : '?') + 'search.page=' + arguments[0];",
+        page,
+    )
+    timed_wait(
+        "page_jump", driver,
+        lambda d: d.execute_script("return document.readyState === 'complete' && location.href;") not in (False, previous),
+        timeout
+    )
+
+
+def parse_list_date(date_text):
+    # Posts from today only show the time; older posts show "YYYY.MM.DD."
+    date_text = date_text.strip()
+    if re.match(r"^\d{2}:\d{2}$", date_text):
+        today = datetime.today()
+        return datetime.combine(today.date(), datetime.strptime(date_text, "%H:%M").time())
+    return datetime.strptime(date_text, "%Y.%m.%d.")
+
+
+def page_date_range(rows):
+    """
+    Returns (oldest, newest) post date on a snapshot page, or None when no row has a readable date.
+    """
+    dates = []
+    for row in rows:
+        try:
+            dates.append(parse_list_date(row["date"]))
+        except (TypeError, ValueError):
+            continue
+    if not dates:
+        return None
+    return min(dates), max(dates)
+
+
+def seek_page(driver, current_page, last_page, is_before_range):
+    """
+    Finds the first page after current_page for which is_before_range(rows) is false.
+
+    current_page must itself be before the range. Pages are probed by galloping ahead
+    (1, 2, 4, ... pages) and then bisecting, so skipping n pages costs about 2*log2(n)
+    page loads. Returns (page, rows, probes) with the browser left on that page, or
+    (None, None, probes) when no page up to last_page qualifies.
+    """
+    loaded = {}
+    state = {"page": current_page}
+
+    def load(page):
+        if state["page"] != page:
+            go_to_page(driver, page)
+            state["page"] = page
+        loaded[page] = snapshot_list_page(driver)
+        return loaded[page]
+
+    low = current_page
+    high = None
+    step = 1
+    while high is None:
+        probe = min(low + step, last_page)
+        if probe == low:
+            return None, None, len(loaded)
+        rows = load(probe)
+        if rows and is_before_range(rows):
+            low = probe
+            step *= 2
+        else:
+            high = probe
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        rows = load(middle)
+        if rows and is_before_range(rows):
+            low = middle
+        else:
+            high = middle
+
+    if not loaded[high]:
+        return None, None, len(loaded)
+    if state["page"] != high:
+        load(high)
+    return high, loaded[high], len(loaded)
@@ -0,0 +1,229 @@
+import json
+import logging
+
+from llm_engine import estimate_tokens, run_chat_completions
+
+logger = logging.getLogger(__name__)
+
+PACKED_INSTRUCTIONS = """
+
+여러 개의 글이 "[글 번호]"로 구분되어 한 번에 주어집니다. 각 글을 서로 독립적으로 위 지침대로 분석하고,
+다른 설명 없이 다음 JSON 형식으로만 응답하세요:
+{"results": [{"id": 글 번호, "analysis": "해당 글의 분석 결과"}]}"""
+
+
+def pack_posts(texts, max_posts_per_request=20, max_chars_per_request=12000):
+    """
+    Groups post indices so each group fits one request; long posts get a group of their own.
+    """
+    groups = []
+    current = []
+    current_chars = 0
+    for index, text in enumerate(texts):
+        if len(text) >= max_chars_per_request:
+            groups.append([index])
+            continue
+        if current and (len(current) >= max_posts_per_request or current_chars + len(text) > max_chars_per_request):
+            groups.append(current)
+            current = []
+            current_chars = 0
+        current.append(index)
+        current_chars += len(text)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_requests(model, system_prompt, texts, max_tokens, packed=False, max_tokens_per_post=512,
+                   max_posts_per_request=20, max_chars_per_request=12000):
+    """
+    Returns (requests, groups): groups[i] lists the post indices answered by requests[i].
+
+    Without packing every post is its own request, exactly as the analyze functions send them.
+    """
+    if packed:
+        groups = pack_posts(texts, max_posts_per_request, max_chars_per_request)
+    else:
+        groups = [[index] for index in range(len(texts))]
+
+    requests = []
+    for group in groups:
+        if len(group) == 1:
+            requests.append({
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": texts[group[0]]}
+                ],
+                "max_tokens": max_tokens
+            })
+            continue
+        user_content = "\n\n".join(f"[{number}]\n{texts[index]}" for number, index in enumerate(group, 1))
+        requests.append({
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt + PACKED_INSTRUCTIONS},
+                {"role": "user", "content": user_content}
+            ],
+            "max_tokens": min(16384, max_tokens_per_post * len(group)),
+            "response_format": {"type": "json_object"}
+        })
+    return requests, groups
+
+
+def _usage_totals(usage):
+    if not usage:
+        return None
+    return {name: usage.get(name, 0) for name in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+def _parse_packed_content(content, size):
+    try:
+        payload = json.loads(content)
+        entries = payload["results"]
+    except (ValueError, KeyError, TypeError):
+        return {}
+    analyses = {}
+    for entry in entries:
+        try:
+            number = int(entry["id"])
+            analysis = str(entry["analysis"]).strip()
+        except (ValueError, KeyError, TypeError):
+            continue
+        if 1 <= number <= size and analysis:
+            analyses[number - 1] = analysis
+    return analyses
+
+
+def unpack_results(groups, results, num_posts):
+    """
+    Spreads request results back onto posts, in post order.
+
+    Returns (post_results, missing): missing lists posts whose packed response did not
+    contain a usable analysis. Usage of a packed request is split evenly over its posts.
+    """
+    post_results = [None] * num_posts
+    missing = []
+    for group, result in zip(groups, results):
+        if len(group) == 1 or result["error"] is not None:
+            for index in group:
+                post_results[index] = result
+            continue
+
+        analyses = _parse_packed_content(result["content"], len(group))
+        usage = None
+        if result["usage"]:
+            usage = {name: value / len(group) for name, value in result["usage"].items()}
+        for position, index in enumerate(group):
+            if position not in analyses:
+                missing.append(index)
+                continue
+            post_results[index] = dict(result, content=analyses[position], usage=usage)
+    return post_results, missing
+
+
+def token_savings(system_prompt, texts, post_results):
+    """
+    Compares the prompt tokens actually used with the estimate for one request per post.
+    """
+    baseline = 0
+    used = 0
+    counted = 0
+    for text, result in zip(texts, post_results):
+        if not result or not result["usage"] or result.get("cached"):
+            continue
+        baseline += estimate_tokens([{"content": system_prompt}, {"content": text}])
+        used += result["usage"]["prompt_tokens"]
+        counted += 1
+    return {
+        "posts": counted,
+        "baseline_prompt_tokens": baseline,
+        "prompt_tokens": round(used),
+        "saved_tokens_per_post": (baseline - used) / counted if counted else 0.0,
+    }
+
+
+def run_packed_chat_completions(client, model, system_prompt, texts, max_tokens, max_tokens_per_post=512,
+                                max_posts_per_request=20, max_chars_per_request=12000, **engine_kwargs):
+    """
+    Analyzes many short posts per request and returns one result per post, like run_chat_completions.
+
+    Posts the model left out of a packed answer are retried as single-post requests.
+    """
+    requests, groups = build_requests(
+        model, system_prompt, texts, max_tokens, True, max_tokens_per_post,
+        max_posts_per_request, max_chars_per_request
+    )
+    results = run_chat_completions(client, requests, **engine_kwargs)
+    post_results, missing = unpack_results(groups, results, len(texts))
+
+    if missing:
+        logger.warning(f"{len(missing)} posts missing from packed responses, sending them individually")
+        retry_requests, _ = build_requests(model, system_prompt, [texts[index] for index in missing], max_tokens)
+        for index, result in zip(missing, run_chat_completions(client, retry_requests, **engine_kwargs)):
+            post_results[index] = result
+
+    logger.info(f"Packed {len(texts)} posts into {len(requests)} requests: {token_savings(system_prompt, texts, post_results)}")
+    return post_results
+
+
+def write_batch_job(path, requests, groups, all_data, system_prompt):
+    """
+    Writes the Batch API input file to path and the posts/groups needed to ingest it to path + ".posts.json".
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for index, request in enumerate(requests):
+            line = {"custom_id": f"request-{index}", "method": "POST", "url": "/v1/chat/completions", "body": request}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    with open(path + ".posts.json", "w", encoding="utf-8") as f:
+        json.dump({"groups": groups, "all_data": all_data, "system_prompt": system_prompt}, f, ensure_ascii=False)
+    logger.info(f"Batch input with {len(requests)} requests written to {path}")
+
+
+def read_batch_job(path, output_path):
+    """
+    Reads a job written by write_batch_job together with the Batch API output file.
+
+    Returns (all_data, post_results) with one result per post in the original order.
+    """
+    with open(path + ".posts.json", encoding="utf-8") as f:
+        job = json.load(f)
+    groups = job["groups"]
+
+    results = [
+        {"content": None, "usage": None, "retries": 0, "cached": False, "error": "missing from batch output"}
+        for _ in groups
+    ]
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            index = int(entry["custom_id"].rsplit("-", 1)[1])
+            response = entry.get("response") or {}
+            if entry.get("error") or response.get("status_code") != 200:
+                results[index]["error"] = entry.get("error") or f"status {response.get('status_code')}"
+                continue
+            body = response["body"]
+            choice = body["choices"][0]
+            # A refusal or a content-filtered response has no content; it fails its posts only
+            if choice["message"].get("content") is None:
+                results[index]["error"] = f"Response without content (finish_reason: {choice.get('finish_reason')})"
+                continue
+            results[index] = {
+                "content": choice["message"]["content"].strip(),
+                "usage": _usage_totals(body.get("usage")),
+                "retries": 0,
+                "cached": False,
+                "error": None,
+            }
+
+    post_results, missing = unpack_results(groups, results, len(job["all_data"]))
+    for index in missing:
+        post_results[index] = {"content": None, "usage": None, "retries": 0, "cached": False,
+                               "error": "missing from packed batch response"}
+
+    texts = [item["Combined"] for item in job["all_data"]]
+    logger.info(f"Batch output for {len(texts)} posts in {len(groups)} requests: "
+                f"{token_savings(job['system_prompt'], texts, post_results)}")
+    return job["all_data"], post_results
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def cache_key(model, messages):
+    # Content-addressed: the same model, system prompt and post text always map to the same key
+    payload = json.dumps({"model": model, "messages": messages}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    On-disk SQLite cache of LLM responses keyed by cache_key().
+
+    Entries older than max_age_days are dropped, and the least recently used entries
+    are evicted once the cache holds more than max_entries rows.
+    """
+
+    def __init__(self, path="llm_cache.sqlite3", max_entries=100000, max_age_days=90):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                usage TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, model, messages):
+        """
+        Returns the cached {"content", "usage"} for the request, or None on a miss.
+        """
+        key = cache_key(model, messages)
+        with self._lock:
+            row = self._conn.execute("SELECT content, usage FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        content, usage = row
+        return {"content": content, "usage": json.loads(usage) if usage else None}
+
+    def put(self, model, messages, content, usage=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(model, messages), model, content, json.dumps(usage) if usage else None, now, now),
+            )
+            self._conn.commit()
+
+    def delete(self, model, messages):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (cache_key(model, messages),))
+            self._conn.commit()
+
+    def evict(self):
+        with self._lock:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+            if self.max_entries:
+                self._conn.execute(
+                    """DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,198 @@
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+from llm_batch import build_requests
+from llm_engine import run_chat_completions
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to the character estimate without tiktoken
+    tiktoken = None
+
+MAP_SYSTEM_PROMPT = (
+    "당신은 긴 카페 글(본문, 댓글, 대댓글)의 일부를 요약하는 도우미입니다. "
+    "이 부분에서 언급된 제품명, 각 의견의 감정(긍정적/부정적/중립적), 주요 의견을 빠짐없이 간결하게 정리하세요."
+)
+
+REDUCE_PREFIX = "아래는 하나의 긴 글(본문, 댓글, 대댓글)을 부분별로 요약한 내용입니다. 전체를 하나의 글로 보고 분석하세요.\n\n"
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text, model="gpt-4o"):
+    encoding = _encoding(model)
+    if encoding is None:
+        # Same rough estimate as the rate limiter: Korean is about one token per 1-2 characters
+        return len(text) // 2 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_characters(text, chunk_tokens, model):
+    # Runs without spaces (ㅋㅋㅋ spam, URLs, pasted data) are cut by characters, halving until they fit
+    parts = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_tokens
+        while end - start > 1 and count_tokens(text[start:end], model) > chunk_tokens:
+            end = start + (end - start) // 2
+        parts.append(text[start:end])
+        start = end
+    return parts
+
+
+def split_text(text, chunk_tokens, model="gpt-4o"):
+    """
+    Splits text into chunks of at most about chunk_tokens tokens, at sentence breaks where possible.
+    """
+    pieces = []
+    for sentence in re.split(r"(?<=[.!?。\n])\s+", text):
+        if count_tokens(sentence, model) <= chunk_tokens:
+            pieces.append(sentence)
+            continue
+        # Combined joins comments with spaces, so very long runs are split between words
+        for word in sentence.split(" "):
+            if count_tokens(word, model) <= chunk_tokens:
+                pieces.append(word)
+            else:
+                pieces.extend(_split_characters(word, chunk_tokens, model))
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = count_tokens(piece, model) + 1
+        if current and current_tokens + piece_tokens > chunk_tokens:
+            chunks.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _add_result(total, result):
+    total["retries"] += result["retries"]
+    total["elapsed"] += result.get("elapsed") or 0.0
+    total["cached"] = total["cached"] and result["cached"]
+    for name, value in (result["usage"] or {}).items():
+        total["usage"][name] = total["usage"].get(name, 0) + value
+
+
+def run_chunked_chat_completions(client, model, system_prompt, texts, max_tokens, max_input_tokens=8000,
+                                 chunk_tokens=4000, chunk_summary_tokens=512, response_format=None, max_map_rounds=3,
+                                 **engine_kwargs):
+    """
+    Analyzes posts like run_chat_completions, but map-reduces posts longer than max_input_tokens.
+
+    Short posts are sent unchanged. A long post is split into chunks of chunk_tokens that are
+    summarized in parallel (map), and the joined summaries are analyzed with system_prompt
+    (reduce); summaries still too long are mapped again. Each result also carries
+    "input_tokens" (tokens in the post) and "chunks" (0 for posts sent directly), and its
+    usage and elapsed add up every call made for the post; a successful result also carries
+    "final_input", the user content of its final call (the post itself unless it was chunked).
+    response_format applies to the final call only; chunk summaries are always plain text.
+    A post whose summaries are still over max_input_tokens after max_map_rounds map rounds
+    fails with an error instead of being mapped again.
+    """
+    # Summaries as long as the chunks they replace, or as the whole input budget, would never shrink the post
+    if chunk_summary_tokens >= chunk_tokens:
+        raise ValueError(f"chunk_summary_tokens ({chunk_summary_tokens}) must be below chunk_tokens ({chunk_tokens})")
+    if chunk_summary_tokens >= max_input_tokens:
+        raise ValueError(
+            f"chunk_summary_tokens ({chunk_summary_tokens}) must be below max_input_tokens ({max_input_tokens})"
+        )
+    input_tokens = [count_tokens(text, model) for text in texts]
+    totals = [
+        {"content": None, "usage": {}, "retries": 0, "cached": True, "error": None, "elapsed": 0.0,
+         "input_tokens": tokens, "chunks": 0}
+        for tokens in input_tokens
+    ]
+    results = [None] * len(texts)
+
+    work = {}  # post index -> ("map", chunks) or ("final", user content)
+    map_rounds = defaultdict(int)
+    for index, text in enumerate(texts):
+        if input_tokens[index] <= max_input_tokens:
+            work[index] = ("final", text)
+        else:
+            work[index] = ("map", split_text(text, chunk_tokens, model))
+            totals[index]["chunks"] = len(work[index][1])
+
+    while work:
+        # Every post's calls of this round go out together, so chunks run in parallel
+        requests = []
+        owners = []
+        for index, (stage, payload) in work.items():
+            if stage == "map":
+                for number, chunk in enumerate(payload, 1):
+                    request = build_requests(
+                        model, MAP_SYSTEM_PROMPT, [f"[부분 {number}/{len(payload)}]\n{chunk}"], chunk_summary_tokens
+                    )[0][0]
+                    requests.append(request)
+                    owners.append(index)
+            else:
+                request = build_requests(model, system_prompt, [payload], max_tokens)[0][0]
+                if response_format is not None:
+                    request["response_format"] = response_format
+                requests.append(request)
+                owners.append(index)
+
+        round_results = defaultdict(list)
+        for index, result in zip(owners, run_chat_completions(client, requests, **engine_kwargs)):
+            round_results[index].append(result)
+            _add_result(totals[index], result)
+
+        next_work = {}
+        for index, (stage, payload) in work.items():
+            post_results = round_results[index]
+            failed = next((result for result in post_results if result["error"] is not None), None)
+            if failed is not None:
+                results[index] = dict(totals[index], error=failed["error"])
+            elif stage == "final":
+                results[index] = dict(totals[index], content=post_results[0]["content"], final_input=payload)
+            else:
+                map_rounds[index] += 1
+                summaries = "\n\n".join(
+                    f"[부분 {number}]\n{result['content']}" for number, result in enumerate(post_results, 1)
+                )
+                reduce_input = REDUCE_PREFIX + summaries
+                summary_tokens = count_tokens(reduce_input, model)
+                if summary_tokens > max_input_tokens and map_rounds[index] >= max_map_rounds:
+                    results[index] = dict(totals[index], error=ValueError(
+                        f"Chunk summaries still have {summary_tokens} tokens (over {max_input_tokens}) "
+                        f"after {map_rounds[index]} map rounds"
+                    ))
+                elif summary_tokens > max_input_tokens:
+                    next_work[index] = ("map", split_text(summaries, chunk_tokens, model))
+                else:
+                    next_work[index] = ("final", reduce_input)
+        work = next_work
+
+    for result in results:
+        if not result["usage"]:
+            result["usage"] = None
+    return results
+
+
+def token_report(results):
+    """
+    Totals of the per-post token counts recorded by run_chunked_chat_completions.
+    """
+    report = {"posts": len(results), "chunked_posts": 0, "input_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    for result in results:
+        report["chunked_posts"] += 1 if result.get("chunks") else 0
+        report["input_tokens"] += result.get("input_tokens") or 0
+        for name in ("prompt_tokens", "completion_tokens"):
+            report[name] += (result["usage"] or {}).get(name, 0)
+    return report
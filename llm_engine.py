@@ -0,0 +1,214 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages, max_tokens=0):
+    # Rough upper bound used for the tokens-per-minute budget: Korean text is about
+    # one token per 1-2 characters, and OpenAI also reserves max_tokens against the limit.
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // 2 + 4 * len(messages) + max_tokens
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window over requests and tokens, shared by all worker threads.
+
+    On a 429 the request budget is cut and every worker pauses until the server's
+    Retry-After has passed; successful calls slowly restore the budget.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._rpm_scale = 1.0
+        self._paused_until = 0.0
+        self._events = deque()  # [timestamp, tokens]
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, now, tokens):
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.requests_per_minute:
+            allowed = max(1, int(self.requests_per_minute * self._rpm_scale))
+            if len(self._events) >= allowed:
+                return self._events[-allowed][0] + self.window - now
+        if self.tokens_per_minute and self._events:
+            # A single request larger than the budget is let through once the window is empty
+            if self._tokens_in_window + tokens > self.tokens_per_minute:
+                return self._events[0][0] + self.window - now
+        return 0.0
+
+    def acquire(self, tokens=0):
+        """
+        Blocks until the request fits the budget and returns its window entry for reconcile().
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    event = [now, tokens]
+                    self._events.append(event)
+                    self._tokens_in_window += tokens
+                    return event
+            time.sleep(min(wait, 1.0))
+
+    def reconcile(self, event, actual_tokens):
+        # Replace the pre-request estimate with the usage the API reported
+        with self._lock:
+            if self._events and event[0] >= self._events[0][0]:
+                self._tokens_in_window += actual_tokens - event[1]
+            event[1] = actual_tokens
+
+    def on_rate_limited(self, retry_after):
+        with self._lock:
+            self._rpm_scale = max(0.1, self._rpm_scale * 0.7)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        with self._lock:
+            self._rpm_scale = min(1.0, self._rpm_scale + 0.02)
+
+
+def _is_retryable(error):
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _call_with_backoff(client, request, rate_limiter, max_retries, base_delay, max_delay, state):
+    estimated_tokens = estimate_tokens(request["messages"], request.get("max_tokens", 0))
+    while True:
+        event = rate_limiter.acquire(estimated_tokens) if rate_limiter else None
+        try:
+            chat_completion = client.chat.completions.create(**request)
+        except Exception as e:
+            if not _is_retryable(e) or state["retries"] >= max_retries:
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = min(max_delay, base_delay * 2 ** state["retries"]) * random.uniform(0.5, 1.0)
+            if rate_limiter and isinstance(e, RateLimitError):
+                rate_limiter.on_rate_limited(delay)
+            logger.warning(f"LLM call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            state["retries"] += 1
+            continue
+
+        if rate_limiter:
+            usage = getattr(chat_completion, "usage", None)
+            if usage is not None:
+                rate_limiter.reconcile(event, usage.total_tokens)
+            rate_limiter.on_success()
+        return chat_completion
+
+
+def _usage_dict(usage):
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+def run_chat_completion(client, request, rate_limiter=None, max_retries=6, base_delay=1.0, max_delay=60.0,
+                        cache=None):
+    """
+    Sends one chat.completions request (or answers it from cache) and returns its result dict,
+    as described in run_chat_completions. client should be created with max_retries=0.
+    """
+    hit = cache.get(request["model"], request["messages"]) if cache is not None else None
+    if hit is not None:
+        return {"content": hit["content"], "usage": hit["usage"], "retries": 0, "cached": True, "error": None,
+                "elapsed": 0.0}
+
+    state = {"retries": 0}
+    start = time.perf_counter()
+    try:
+        chat_completion = _call_with_backoff(
+            client, request, rate_limiter, max_retries, base_delay, max_delay, state
+        )
+        # A refusal or a content-filtered response has no content; it fails this post only
+        choice = chat_completion.choices[0]
+        if choice.message.content is None:
+            raise ValueError(f"Response without content (finish_reason: {choice.finish_reason})")
+        result = {
+            "content": choice.message.content.strip(),
+            "usage": _usage_dict(chat_completion.usage),
+            "retries": state["retries"],
+            "cached": False,
+            "error": None,
+            "elapsed": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {"content": None, "usage": None, "retries": state["retries"], "cached": False, "error": e,
+                "elapsed": time.perf_counter() - start}
+    if cache is not None:
+        cache.put(request["model"], request["messages"], result["content"], result["usage"])
+    return result
+
+
+def run_chat_completions(client, requests, max_workers=8, rate_limiter=None, max_retries=6,
+                         base_delay=1.0, max_delay=60.0, cache=None):
+    """
+    Sends every chat.completions request through a bounded thread pool.
+
+    Returns one dict per request, in input order, with "content", "usage", "retries",
+    "cached", "error" (None on success) and "elapsed" (seconds spent on the call, retries
+    and rate limiting included). Failed requests never abort the rest of the run.
+    Requests found in cache (an LLMCache) are answered without calling the API.
+    """
+    # Retries are handled here so they can share the rate limiter's backoff state
+    client = client.with_options(max_retries=0)
+
+    def worker(request):
+        # Cache lookups are done up front, so only successful results are stored here
+        result = run_chat_completion(client, request, rate_limiter, max_retries, base_delay, max_delay)
+        if cache is not None and result["error"] is None:
+            cache.put(request["model"], request["messages"], result["content"], result["usage"])
+        return result
+
+    results = [None] * len(requests)
+    pending = []
+    for index, request in enumerate(requests):
+        hit = cache.get(request["model"], request["messages"]) if cache is not None else None
+        if hit is not None:
+            results[index] = {"content": hit["content"], "usage": hit["usage"], "retries": 0,
+                              "cached": True, "error": None, "elapsed": 0.0}
+        else:
+            pending.append(index)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            for index, result in zip(pending, executor.map(worker, [requests[i] for i in pending])):
+                results[index] = result
+    return results
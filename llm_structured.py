@@ -0,0 +1,175 @@
+import json
+import logging
+
+from llm_batch import build_requests
+from llm_chunking import run_chunked_chat_completions
+from sentiment_lexicon import SENTIMENT_LABELS_KO
+
+logger = logging.getLogger(__name__)
+
+# What the model returns per post in structured mode, instead of free-form prose
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+        "summary": {"type": "string"},
+        "products": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["sentiment", "summary", "products"],
+    "additionalProperties": False,
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "post_analysis", "strict": True, "schema": ANALYSIS_SCHEMA},
+}
+
+STRUCTURED_INSTRUCTIONS = """
+
+다른 설명 없이 다음 JSON 객체 하나로만 응답하세요:
+{"sentiment": "positive" | "negative" | "neutral", "summary": "80자 이내의 한 문장 요약", "products": ["언급된 제품명"]}"""
+
+
+def parse_analysis(content, max_summary_chars=200):
+    """
+    Parses and validates a structured response against ANALYSIS_SCHEMA.
+
+    Raises ValueError when it is not a JSON object of that shape. Over-long summaries are cut.
+    """
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"not JSON: {e}")
+    if not isinstance(payload, dict) or set(payload) != set(ANALYSIS_SCHEMA["required"]):
+        raise ValueError(f"expected keys {ANALYSIS_SCHEMA['required']}")
+    if payload["sentiment"] not in ANALYSIS_SCHEMA["properties"]["sentiment"]["enum"]:
+        raise ValueError(f"unknown sentiment {payload['sentiment']!r}")
+    if not isinstance(payload["summary"], str):
+        raise ValueError("summary is not a string")
+    if not isinstance(payload["products"], list) or not all(isinstance(p, str) for p in payload["products"]):
+        raise ValueError("products is not a list of strings")
+    return {
+        "sentiment": payload["sentiment"],
+        "summary": payload["summary"].strip()[:max_summary_chars],
+        "products": [product.strip() for product in payload["products"] if product.strip()],
+    }
+
+
+def structured_content(analysis):
+    # Same "감정: ..." first line as the prose answers, so the report reads the same
+    lines = [f"감정: {SENTIMENT_LABELS_KO[analysis['sentiment']]}"]
+    if analysis["summary"]:
+        lines.append(f"요약: {analysis['summary']}")
+    if analysis["products"]:
+        lines.append(f"언급 제품: {', '.join(analysis['products'])}")
+    return "\n".join(lines)
+
+
+def _merge_attempt(previous, result):
+    if previous is None:
+        return result
+    usage = dict(previous["usage"] or {})
+    for name, value in (result["usage"] or {}).items():
+        usage[name] = usage.get(name, 0) + value
+    return dict(
+        result,
+        usage=usage or None,
+        retries=previous["retries"] + result["retries"],
+        elapsed=(previous.get("elapsed") or 0.0) + (result.get("elapsed") or 0.0),
+        cached=False,
+        input_tokens=previous.get("input_tokens"),
+        chunks=previous.get("chunks"),
+    )
+
+
+def run_structured_chat_completions(client, model, system_prompt, texts, max_tokens=256, max_attempts=3,
+                                    max_input_tokens=8000, chunk_tokens=4000, chunk_summary_tokens=512,
+                                    **engine_kwargs):
+    """
+    Analyzes posts like run_chunked_chat_completions, asking for a compact JSON object per post.
+
+    Each successful result gets "analysis" ({"sentiment", "summary", "products"}) and a short
+    content built from it. Responses that fail parse_analysis are requested again, up to
+    max_attempts in total; posts still malformed get an error. A retry repeats only the final
+    call, so the chunk summaries of a long post are not requested again, and the malformed
+    answer is removed from the cache first.
+    """
+    prompt = system_prompt + STRUCTURED_INSTRUCTIONS
+    cache = engine_kwargs.get("cache")
+    results = [None] * len(texts)
+    attempts = [None] * len(texts)
+    pending = list(range(len(texts)))
+    inputs = list(texts)
+
+    for attempt in range(1, max_attempts + 1):
+        batch = run_chunked_chat_completions(
+            client, model, prompt, [inputs[index] for index in pending], max_tokens,
+            max_input_tokens, chunk_tokens, chunk_summary_tokens, response_format=RESPONSE_FORMAT, **engine_kwargs
+        )
+        malformed = []
+        for index, result in zip(pending, batch):
+            attempts[index] = _merge_attempt(attempts[index], result)
+            if result["error"] is not None:
+                results[index] = attempts[index]
+                continue
+            try:
+                analysis = parse_analysis(result["content"])
+            except ValueError as e:
+                logger.warning(f"Malformed structured response for post {index + 1} (attempt {attempt}): {e}")
+                # The final input fits one request, so the retry skips straight to the final call
+                inputs[index] = result["final_input"]
+                if cache is not None:
+                    # Otherwise the cache would only return the same malformed answer again
+                    request = build_requests(model, prompt, [inputs[index]], max_tokens)[0][0]
+                    cache.delete(model, request["messages"])
+                malformed.append(index)
+                continue
+            results[index] = dict(
+                attempts[index], content=structured_content(analysis), analysis=analysis, attempts=attempt
+            )
+        pending = malformed
+        if not pending:
+            break
+
+    for index in pending:
+        results[index] = dict(
+            attempts[index], content=None, attempts=max_attempts,
+            error=f"malformed structured response after {max_attempts} attempts"
+        )
+    return results
+
+
+def output_report(results):
+    """
+    Per-post means of latency and tokens over posts answered by the API (not cached or local).
+    """
+    answered = [
+        result for result in results
+        if result and result["error"] is None and result["usage"] and not result.get("cached") and not result.get("local")
+    ]
+    report = {
+        "posts": len(results),
+        "api_posts": len(answered),
+        "malformed_retries": sum((result.get("attempts") or 1) - 1 for result in results if result),
+    }
+    if answered:
+        report["mean_latency_s"] = sum(result.get("elapsed") or 0.0 for result in answered) / len(answered)
+        report["mean_prompt_tokens"] = sum(result["usage"]["prompt_tokens"] for result in answered) / len(answered)
+        report["mean_completion_tokens"] = sum(result["usage"]["completion_tokens"] for result in answered) / len(answered)
+    return report
+
+
+def output_savings(baseline_results, structured_results):
+    """
+    Compares output_report() of a prose run with that of a structured run over the same posts.
+    """
+    baseline = output_report(baseline_results)
+    structured = output_report(structured_results)
+    if not baseline["api_posts"] or not structured["api_posts"]:
+        return {"baseline": baseline, "structured": structured}
+    return {
+        "baseline": baseline,
+        "structured": structured,
+        "completion_tokens_saved_per_post": baseline["mean_completion_tokens"] - structured["mean_completion_tokens"],
+        "latency_saved_per_post_s": baseline["mean_latency_s"] - structured["mean_latency_s"],
+    }
@@ -0,0 +1,192 @@
+import cProfile
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the span duration buckets, as in the wait histogram
+SPAN_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+# Per-run metrics: span durations (count, total, max and bucket counts per span name) and
+# counters keyed by (name, labels). Module-level like the wait timings, shared by all threads.
+span_stats = {}
+counters = defaultdict(float)
+run_info = {"started_at": time.time()}
+_lock = threading.Lock()
+
+
+def _record_span(name, elapsed, failed):
+    with _lock:
+        stats = span_stats.get(name)
+        if stats is None:
+            stats = span_stats[name] = {"count": 0, "errors": 0, "total": 0.0, "max": 0.0,
+                                        "buckets": [0] * (len(SPAN_BUCKETS) + 1)}
+        stats["count"] += 1
+        stats["errors"] += 1 if failed else 0
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        index = next((i for i, bound in enumerate(SPAN_BUCKETS) if elapsed <= bound), len(SPAN_BUCKETS))
+        stats["buckets"][index] += 1
+
+
+@contextmanager
+def span(name):
+    """
+    Times the enclosed block under name; a block left by an exception is also counted as an error.
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _record_span(name, time.perf_counter() - start, failed)
+
+
+def timed(name):
+    # Decorator form of span()
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def incr(name, value=1, **labels):
+    with _lock:
+        counters[(name, tuple(sorted(labels.items())))] += value
+
+
+def count_llm_results(results, stage="analysis"):
+    """
+    Adds the requests, retries, tokens, cache hits and errors of LLM result dicts to the counters.
+    """
+    for result in results:
+        if result is None:
+            continue
+        if result.get("local"):
+            incr("llm_local_posts", stage=stage)
+            continue
+        incr("llm_posts", stage=stage)
+        incr("llm_retries", result.get("retries") or 0, stage=stage)
+        incr("llm_cached_posts" if result.get("cached") else "llm_api_posts", stage=stage)
+        if result.get("error") is not None:
+            incr("llm_errors", stage=stage)
+        for token_type in ("prompt_tokens", "completion_tokens"):
+            incr("llm_tokens", (result.get("usage") or {}).get(token_type, 0), stage=stage, type=token_type)
+
+
+def instrument_driver(driver):
+    """
+    Counts every WebDriver command the driver (and its elements) sends, per command name.
+    """
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        incr("webdriver_commands", command=driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
+
+
+def metrics_snapshot():
+    with _lock:
+        return {
+            "run": dict(run_info, finished_at=time.time(), elapsed=time.time() - run_info["started_at"]),
+            "spans": {
+                name: {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "total_s": stats["total"],
+                    "mean_s": stats["total"] / stats["count"],
+                    "max_s": stats["max"],
+                    "histogram": dict(zip([f"<={bound}s" for bound in SPAN_BUCKETS] + [f">{SPAN_BUCKETS[-1]}s"],
+                                          stats["buckets"])),
+                }
+                for name, stats in span_stats.items()
+            },
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def prometheus_text(snapshot):
+    """
+    The snapshot in the Prometheus text exposition format: a histogram per span, a counter per counter.
+    """
+    lines = [
+        "# TYPE navercafe_span_seconds histogram",
+    ]
+    for name, stats in snapshot["spans"].items():
+        cumulative = 0
+        for label, count in stats["histogram"].items():
+            cumulative += count
+            bound = "+Inf" if label.startswith(">") else label[2:-1]
+            lines.append(f'navercafe_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'navercafe_span_seconds_sum{{span="{name}"}} {stats["total_s"]}')
+        lines.append(f'navercafe_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    lines.append("# TYPE navercafe_span_errors_total counter")
+    for name, stats in snapshot["spans"].items():
+        lines.append(f'navercafe_span_errors_total{{span="{name}"}} {stats["errors"]}')
+    for name in sorted({counter["name"] for counter in snapshot["counters"]}):
+        lines.append(f"# TYPE navercafe_{name}_total counter")
+        for counter in snapshot["counters"]:
+            if counter["name"] == name:
+                lines.append(f"navercafe_{name}_total{_prometheus_labels(counter['labels'])} {counter['value']}")
+    lines.append(f"navercafe_run_elapsed_seconds {snapshot['run']['elapsed']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    """
+    Writes this run's metrics to path: Prometheus text for a .prom file, JSON otherwise.
+    """
+    snapshot = metrics_snapshot()
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".prom"):
+            f.write(prometheus_text(snapshot))
+        else:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+    return snapshot
+
+
+def configure_logging(level="INFO"):
+    logging.basicConfig(level=getattr(logging, level.upper(), logging.INFO), format="%(message)s")
+
+
+def run_main(main, script, metrics_path=None, profile_path=None):
+    """
+    Runs a script's main(), writing the metrics file afterwards (even when main fails) and,
+    with profile_path, the cProfile stats of the whole run (read them with pstats).
+    """
+    run_info["script"] = script
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler is not None:
+            profiler.runcall(main)
+        else:
+            main()
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(profile_path)
+            logging.getLogger(script).info(f"Profile saved to {profile_path}")
+        if metrics_path:
+            write_metrics(metrics_path)
+            logging.getLogger(script).info(f"Metrics saved to {metrics_path}")
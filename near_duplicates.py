@@ -0,0 +1,146 @@
+import logging
+import re
+import threading
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Largest 31-bit prime: (a * x + b) % MINHASH_PRIME stays within uint64 for 31-bit a, x and b
+MINHASH_PRIME = (1 << 31) - 1
+
+
+def shingles(text, size=5):
+    """
+    The set of character size-grams of text, lowercased with whitespace collapsed.
+
+    Character shingles work for Korean text without a tokenizer and tolerate the small
+    edits (spacing, emoji, a changed line) that separate a repost from its original.
+    """
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[start:start + size] for start in range(len(text) - size + 1)}
+
+
+def lsh_bands(threshold, num_perm):
+    # Most rows per band whose estimated S-curve threshold (1/b)^(1/r) is still below threshold,
+    # so groups above threshold are almost always candidates; candidates are verified afterwards
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash signatures with LSH banding, grouping texts whose shingle sets are about threshold-similar.
+
+    add() hashes a text into num_perm MinHash values and looks up only the groups sharing
+    one of its bands, so an insert costs the same however many texts are indexed. A candidate
+    is accepted when the share of equal signature values (the estimated Jaccard similarity)
+    reaches threshold. Each group is represented by its first text, and later texts are only
+    compared with representatives, so groups do not drift through chains of similar texts.
+    Thread-safe, as posts arrive from several crawler threads.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=5, seed=1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self._representative = {}
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def signature(self, text):
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) & MINHASH_PRIME for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64,
+        )
+        if not len(hashes):
+            return None
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MINHASH_PRIME).min(axis=1)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def add(self, key, text):
+        """
+        Indexes text under key and returns the key of its group's representative (key itself for a new group).
+        """
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature) if signature is not None else []
+        with self._lock:
+            if key in self._representative:
+                return self._representative[key]
+            best, best_similarity = None, self.threshold
+            candidates = set()
+            for bucket, band_key in zip(self._buckets, band_keys):
+                candidates.update(bucket.get(band_key, ()))
+            for candidate in candidates:
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None:
+                self._representative[key] = best
+                self._members[best].append(key)
+                return best
+
+            # Texts without any shingle (empty posts) are kept as groups of their own
+            self._representative[key] = key
+            self._members[key] = [key]
+            if signature is not None:
+                self._signatures[key] = signature
+                for bucket, band_key in zip(self._buckets, band_keys):
+                    bucket.setdefault(band_key, []).append(key)
+            return key
+
+    def group_size(self, key):
+        with self._lock:
+            return len(self._members.get(self._representative.get(key, key), ())) or 1
+
+    def groups(self):
+        """
+        Returns {representative key: [member keys, the representative first]} in insertion order.
+        """
+        with self._lock:
+            return {key: list(members) for key, members in self._members.items()}
+
+    def stats(self):
+        with self._lock:
+            sizes = sorted((len(members) for members in self._members.values()), reverse=True)
+        posts = sum(sizes)
+        duplicate_groups = [size for size in sizes if size > 1]
+        return (f"{posts} posts in {len(sizes)} groups, {posts - len(sizes)} near-duplicates skipped, "
+                f"{len(duplicate_groups)} groups with duplicates (largest: {duplicate_groups[:5]})")
+
+
+def group_near_duplicates(all_data, index, key=None):
+    """
+    Returns the representative of every near-duplicate group in all_data, in post order.
+
+    Each representative's "Duplicates" is set to the number of posts in its group (1 when
+    it has no duplicates). key(item) identifies posts (default: their position); a post whose
+    key was already seen (the same article found under another keyword) is dropped.
+    """
+    representatives = []
+    seen = set()
+    for position, item in enumerate(all_data):
+        item_key = key(item) if key is not None else position
+        if item_key in seen:
+            continue
+        seen.add(item_key)
+        if index.add(item_key, item["Combined"]) == item_key:
+            representatives.append((item_key, item))
+    for item_key, item in representatives:
+        item["Duplicates"] = index.group_size(item_key)
+    logger.info(f"Near-duplicates: {index.stats()}")
+    return [item for _, item in representatives]
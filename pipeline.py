@@ -0,0 +1,232 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from crawl_state import post_key
+from product_matcher import ProductMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryAggregator:
+    """
+    Collects the summary of each analyzed post as it arrives.
+
+    Posts can arrive in any order; summaries() returns them in the order they were numbered.
+    Only the title, date and token counts of each post are kept, not its text. A sink (such as
+    corpus_store.CorpusStore.add) is also called with (item, entry, summary) for every post.
+    """
+
+    def __init__(self, sink=None):
+        self._entries = []
+        self._lock = threading.Lock()
+        # Checkpoints are written from the analysis threads and on close, one at a time
+        self._checkpoint_lock = threading.Lock()
+        self.sink = sink
+
+    def _summarize(self, item, result):
+        if result["error"] is not None:
+            logger.warning(f"Error during GPT-4o call: {result['error']}")
+            return "Error processing text"
+        return result["content"]
+
+    def _entry(self, item, result):
+        usage = result["usage"] or {}
+        return {
+            "Title": item["Title"],
+            "Date": item.get("Date"),
+            "InputTokens": result.get("input_tokens"),
+            "PromptTokens": usage.get("prompt_tokens"),
+            "CompletionTokens": usage.get("completion_tokens"),
+            "Duplicates": item.get("Duplicates", 1),
+        }
+
+    def add(self, seq, item, result):
+        summary = self._summarize(item, result)
+        entry = self._entry(item, result)
+        with self._lock:
+            self._entries.append((seq, entry, summary))
+        if self.sink is not None:
+            self.sink(item, entry, summary)
+
+    def set_duplicates(self, group_sizes):
+        """
+        Sets the "Duplicates" of the posts numbered in group_sizes ({seq: posts in its near-duplicate group}).
+        """
+        with self._lock:
+            for seq, entry, _ in self._entries:
+                entry["Duplicates"] = group_sizes.get(seq, entry["Duplicates"])
+
+    def summaries(self):
+        """
+        Returns (all_data, summaries) in post order; all_data holds the Title, Date and token counts of each post.
+        """
+        with self._lock:
+            entries = sorted(self._entries, key=lambda entry: entry[0])
+        return [item for _, item, _ in entries], [summary for _, _, summary in entries]
+
+    def _checkpoint(self):
+        all_data, summaries = self.summaries()
+        return {
+            "total_posts": len(all_data),
+            "posts": [dict(item, Summary=summary) for item, summary in zip(all_data, summaries)],
+        }
+
+    def write_checkpoint(self, path):
+        with self._checkpoint_lock:
+            checkpoint = self._checkpoint()
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+
+
+class ReportAggregator(SummaryAggregator):
+    """
+    Also keeps the report's product/category/sentiment counts up to date, one post at a time.
+
+    With a sentiment_classifier (see sentiment_lexicon), posts whose summary has no sentiment
+    marker are counted with the local classifier's label instead of being left out. Each
+    post's entry also records its "Sentiment" and mentioned "Products".
+    """
+
+    def __init__(self, product_category_mapping, sentiment_classifier=None, sink=None):
+        super().__init__(sink)
+        self.product_matcher = ProductMatcher(product_category_mapping)
+        self.sentiment_classifier = sentiment_classifier
+        self.product_count = defaultdict(int)
+        self.category_count = defaultdict(int)
+        self.sentiment_count = {'positive': 0, 'neutral': 0, 'negative': 0}
+
+    def add(self, seq, item, result):
+        summary = self._summarize(item, result)
+        sentiment = None
+        if result["error"] is None and result.get("analysis"):
+            # Structured responses were validated when parsed
+            sentiment = result["analysis"]["sentiment"]
+        elif result["error"] is None:
+            # Extract sentiment from the structured response
+            if "감정: 긍정적" in summary:
+                sentiment = 'positive'
+            elif "감정: 부정적" in summary:
+                sentiment = 'negative'
+            elif "감정: 중립적" in summary:
+                sentiment = 'neutral'
+            elif self.sentiment_classifier is not None:
+                sentiment = self.sentiment_classifier.classify(item["Combined"])["label"]
+                logger.debug(f"Sentiment not detected in summary, counted as {sentiment} by the local classifier")
+            else:
+                logger.warning(f"Sentiment not detected correctly in summary: {summary}")
+
+        entry = self._entry(item, result)
+        entry["Sentiment"] = sentiment
+        with self._lock:
+            if result["error"] is None:
+                # Count product mentions per category: each product is counted only once per post
+                entry["Products"] = self.product_matcher.count_mentions(
+                    item["Combined"], self.product_count, self.category_count
+                )
+            else:
+                entry["Products"] = []
+            if sentiment:
+                self.sentiment_count[sentiment] += 1
+            self._entries.append((seq, entry, summary))
+        if self.sink is not None:
+            self.sink(item, entry, summary)
+
+    def results(self):
+        """
+        Returns (all_data, summaries, product_count, category_count, sentiment_count, total_posts).
+        """
+        with self._lock:
+            entries = sorted(self._entries, key=lambda entry: entry[0])
+            return (
+                [item for _, item, _ in entries],
+                [summary for _, _, summary in entries],
+                dict(self.product_count),
+                dict(self.category_count),
+                dict(self.sentiment_count),
+                len(entries),
+            )
+
+    def _checkpoint(self):
+        all_data, summaries, product_count, category_count, sentiment_count, total_posts = self.results()
+        return {
+            "total_posts": total_posts,
+            "product_count": product_count,
+            "category_count": category_count,
+            "sentiment_count": sentiment_count,
+            "posts": [dict(item, Summary=summary) for item, summary in zip(all_data, summaries)],
+        }
+
+
+class StreamingPipeline:
+    """
+    Analyzes posts while scraping is still running.
+
+    Scraper threads hand each post to submit(), which blocks once max_pending posts are
+    waiting for analysis, so at most that many full post texts are held in memory.
+    analyze_post(item) returns an LLM result dict and runs on max_workers threads; results
+    go straight into the aggregator, which is checkpointed every checkpoint_every posts.
+    With near_duplicates (a near_duplicates.NearDuplicateIndex), only the first post of each
+    near-duplicate group is analyzed; the group sizes are recorded when the pipeline closes.
+    """
+
+    def __init__(self, analyze_post, aggregator, max_workers=8, max_pending=64,
+                 checkpoint_path=None, checkpoint_every=50, near_duplicates=None):
+        self.analyze_post = analyze_post
+        self.aggregator = aggregator
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.near_duplicates = near_duplicates
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._keys = {}
+        self._submitted = 0
+        self._completed = 0
+
+    def submit(self, item):
+        key = post_key(item)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            if self.near_duplicates is not None and self.near_duplicates.add(key, item["Combined"]) != key:
+                return False
+            seq = self._submitted
+            self._keys[seq] = key
+            self._submitted += 1
+
+        self._slots.acquire()
+        future = self._executor.submit(self._process, seq, item)
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _process(self, seq, item):
+        try:
+            result = self.analyze_post(item)
+        except Exception as e:
+            result = {"content": None, "usage": None, "retries": 0, "cached": False, "error": e}
+        self.aggregator.add(seq, item, result)
+
+        with self._lock:
+            self._completed += 1
+            checkpoint = self.checkpoint_path and self._completed % self.checkpoint_every == 0
+        if checkpoint:
+            self.aggregator.write_checkpoint(self.checkpoint_path)
+
+    def close(self, cancel_pending=False):
+        """
+        Waits for submitted posts to be analyzed (or drops the queued ones) and writes a final checkpoint.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        if self.near_duplicates is not None:
+            self.aggregator.set_duplicates(
+                {seq: self.near_duplicates.group_size(key) for seq, key in self._keys.items()}
+            )
+            logger.info(f"Near-duplicates: {self.near_duplicates.stats()}")
+        if self.checkpoint_path:
+            self.aggregator.write_checkpoint(self.checkpoint_path)
+        logger.info(f"Streaming pipeline: {self._completed} of {self._submitted} posts analyzed")
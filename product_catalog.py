@@ -0,0 +1,118 @@
+import hashlib
+import logging
+import os
+import pickle
+
+import pandas as pd
+
+from product_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the cached payload or the name normalization changes
+CATALOG_CACHE_VERSION = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_catalog(df):
+    """
+    Builds the product -> category mapping from the catalog's 상품명/카테고리 columns.
+
+    Bracketed or parenthesized parts of a name are removed, as before; a name listed more
+    than once keeps its last category. Returns (mapping, issues), where issues lists the
+    rows without a name, exact duplicates, names listed with different categories and
+    distinct names the matcher cannot tell apart (equal without spaces and case).
+    """
+    names = df["상품명"].astype("string").str.replace(r"[\[\(].*?[\]\)]", "", regex=True).str.strip()
+    catalog = pd.DataFrame({"name": names, "category": df["카테고리"]})
+    missing = catalog["name"].isna()
+    catalog = catalog[~missing]
+
+    duplicated = catalog.duplicated(["name", "category"], keep="first")
+    categories = catalog.drop_duplicates(["name", "category"]).groupby("name")["category"].agg(list)
+    conflicting = categories[categories.map(len) > 1]
+
+    unique_names = catalog["name"].drop_duplicates()
+    normalized = unique_names.map(normalize_text)
+    collisions = unique_names.groupby(normalized.values).agg(list)
+    collisions = collisions[collisions.map(len) > 1]
+
+    mapping = dict(zip(catalog["name"], catalog["category"]))
+    issues = {
+        "rows_without_name": int(missing.sum()),
+        "duplicate_rows": int(duplicated.sum()),
+        "conflicting_categories": {name: list(values) for name, values in conflicting.items()},
+        "indistinguishable_names": [list(values) for values in collisions],
+        "empty_names": int((catalog["name"] == "").sum()),
+    }
+    return mapping, issues
+
+
+def _print_issues(path, mapping, issues):
+    logger.info(f"Product catalog {os.path.basename(path)}: {len(mapping)} products, "
+                f"{issues['duplicate_rows']} duplicate rows, {issues['rows_without_name']} rows without a name")
+    for name, categories in issues["conflicting_categories"].items():
+        logger.warning(f"  Product '{name}' is listed under several categories {categories}; using '{mapping[name]}'")
+    for names in issues["indistinguishable_names"]:
+        logger.warning(f"  Products {names} only differ in spaces or case and match the same text")
+    if issues["empty_names"]:
+        logger.warning(f"  {issues['empty_names']} product names are empty once brackets are removed and match every post")
+
+
+def load_catalog(excel_file, cache_path=None):
+    """
+    Reads the product catalog with build_catalog(), reusing the parsed mapping cached at cache_path.
+
+    The cache is valid while the catalog file keeps its size and modification time, or,
+    when those changed (a copy or re-export), its SHA-256 hash.
+    """
+    stat = os.stat(excel_file)
+    cached = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable product catalog cache {cache_path}: {e}")
+        if cached is not None and cached.get("version") != CATALOG_CACHE_VERSION:
+            cached = None
+
+    digest = None
+    if cached is not None:
+        if cached["path"] == os.path.abspath(excel_file) and cached["size"] == stat.st_size \
+                and cached["mtime_ns"] == stat.st_mtime_ns:
+            _print_issues(excel_file, cached["mapping"], cached["issues"])
+            return cached["mapping"]
+        digest = file_sha256(excel_file)
+        if cached["sha256"] != digest:
+            cached = None
+
+    if cached is not None:
+        mapping, issues = cached["mapping"], cached["issues"]
+    else:
+        mapping, issues = build_catalog(pd.read_excel(excel_file))
+
+    if cache_path:
+        payload = {
+            "version": CATALOG_CACHE_VERSION,
+            "path": os.path.abspath(excel_file),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest or file_sha256(excel_file),
+            "mapping": mapping,
+            "issues": issues,
+        }
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+
+    _print_issues(excel_file, mapping, issues)
+    return mapping
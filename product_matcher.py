@@ -0,0 +1,88 @@
+from collections import deque
+
+
+def normalize_text(text):
+    # Same normalization the per-product regex loop used: spaces removed, case-insensitive
+    return text.replace(" ", "").lower()
+
+
+class ProductMatcher:
+    """
+    Aho-Corasick automaton over every product name in the catalog.
+
+    The automaton is built once from product_category_mapping and each post is
+    scanned once, instead of compiling one regex per product per post.
+    """
+
+    def __init__(self, product_category_mapping):
+        self.product_category_mapping = dict(product_category_mapping)
+        self.products = list(self.product_category_mapping)
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        # Products whose name is empty after normalization matched every post with the old regex
+        self._always = []
+
+        for index, product in enumerate(self.products):
+            pattern = normalize_text(product)
+            if not pattern:
+                self._always.append(index)
+                continue
+            self._add_pattern(pattern, index)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern, index):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_products(self, text):
+        """
+        Returns the products mentioned in text, each product at most once, in catalog order.
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = set(self._always)
+        state = 0
+        for ch in normalize_text(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return [self.products[index] for index in sorted(found)]
+
+    def count_mentions(self, text, product_count, category_count):
+        """
+        Adds one to product_count per mentioned product and one to category_count per
+        mentioned product's category, and returns the mentioned products.
+        """
+        mentioned_products = self.find_products(text)
+        for product in mentioned_products:
+            product_count[product] += 1
+            category_count[self.product_category_mapping[product]] += 1
+        return mentioned_products
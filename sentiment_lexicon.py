@@ -0,0 +1,88 @@
+import re
+
+from product_matcher import normalize_text
+
+# Stems of clearly positive/negative expressions in camping product posts and comments.
+# Matching is done on text without spaces, like product names.
+POSITIVE_TERMS = [
+    "좋", "만족", "추천", "최고", "편하", "편해", "편리", "튼튼", "견고", "예쁘", "예뻐", "이쁘", "이뻐",
+    "깔끔", "훌륭", "괜찮", "굿", "짱", "대박", "강추", "마음에들", "맘에들", "잘샀", "잘산", "든든",
+    "따뜻", "따듯", "쾌적", "가성비", "감사", "사랑", "완벽", "최애", "재구매", "감동",
+]
+NEGATIVE_TERMS = [
+    "별로", "실망", "불만", "최악", "불편", "고장", "환불", "반품", "파손", "찢어", "찢어짐", "비싸",
+    "아쉽", "아쉬", "문제", "후회", "짜증", "누수", "새요", "새서", "불량", "하자", "싫", "망가",
+    "녹슬", "녹이", "냄새", "나쁘", "약해", "허접", "비추", "애매", "황당",
+]
+# Negated expressions flip the polarity of the stem they contain; they are longer than the
+# stem, so the matcher prefers them at the same position
+NEGATED_POSITIVE_TERMS = [
+    "안좋", "좋지않", "좋진않", "별로좋", "추천안", "추천하지않", "만족못", "만족스럽지않", "편하지않", "편하진않",
+]
+NEGATED_NEGATIVE_TERMS = [
+    "나쁘지않", "나쁘진않", "불편하지않", "불편함없", "불편한점없", "문제없", "문제는없", "고장없", "후회없",
+    "후회안", "아쉬운점없", "아쉬움없", "냄새없", "누수없", "하자없", "불량없",
+]
+
+SENTIMENT_LABELS_KO = {"positive": "긍정적", "negative": "부정적", "neutral": "중립적"}
+
+
+class LexiconSentiment:
+    """
+    Offline Korean sentiment classifier that counts positive and negative expressions.
+
+    classify() returns {"label", "confidence", "positive", "negative"}. confidence is the
+    margin between the two counts, scaled down when there are fewer than min_hits
+    expressions; a text without any is "neutral" with confidence 0.
+    """
+
+    def __init__(self, threshold=0.8, min_hits=3, positive_terms=None, negative_terms=None):
+        self.threshold = threshold
+        self.min_hits = min_hits
+        polarity = {}
+        for terms, value in (
+            (positive_terms or POSITIVE_TERMS, 1),
+            (negative_terms or NEGATIVE_TERMS, -1),
+            (NEGATED_POSITIVE_TERMS, -1),
+            (NEGATED_NEGATIVE_TERMS, 1),
+        ):
+            for term in terms:
+                polarity[normalize_text(term)] = value
+        self.polarity = polarity
+        # Longest terms first, so a negated expression wins over the stem inside it
+        self.pattern = re.compile("|".join(re.escape(term) for term in sorted(polarity, key=len, reverse=True)))
+
+    def classify(self, text):
+        positive = 0
+        negative = 0
+        for match in self.pattern.finditer(normalize_text(text)):
+            if self.polarity[match.group()] > 0:
+                positive += 1
+            else:
+                negative += 1
+
+        hits = positive + negative
+        if hits == 0:
+            return {"label": "neutral", "confidence": 0.0, "positive": 0, "negative": 0}
+        label = "positive" if positive > negative else "negative" if negative > positive else "neutral"
+        confidence = abs(positive - negative) / hits * min(1.0, hits / self.min_hits)
+        return {"label": label, "confidence": confidence, "positive": positive, "negative": negative}
+
+    def classify_batch(self, texts):
+        return [self.classify(text) for text in texts]
+
+    def is_confident(self, sentiment):
+        return sentiment["label"] != "neutral" and sentiment["confidence"] >= self.threshold
+
+
+def local_result(sentiment):
+    """
+    An LLM-style result dict for a post classified locally; its content carries the same
+    "감정: ..." marker the report counts.
+    """
+    content = (
+        f"감정: {SENTIMENT_LABELS_KO[sentiment['label']]}\n"
+        f"(로컬 감정 분석: 긍정 표현 {sentiment['positive']}개, 부정 표현 {sentiment['negative']}개, "
+        f"신뢰도 {sentiment['confidence']:.2f})"
+    )
+    return {"content": content, "usage": None, "retries": 0, "cached": False, "error": None, "local": True}
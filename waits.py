@@ -0,0 +1,131 @@
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Upper bounds (seconds) of the wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10)
+
+# Seconds spent in each wait, per scraping step, and how many of them timed out
+wait_timings = defaultdict(list)
+wait_timeouts = defaultdict(int)
+
+# True once the document is loaded and no resource has finished loading for arguments[0] ms.
+# Resources still in flight have no performance entry yet, so a quiet period means the
+# requests started by the last action (comments, list pages) have completed.
+NETWORK_IDLE_SCRIPT = """
+if (document.readyState !== 'complete') return false;
+const entries = performance.getEntriesByType('resource');
+const lastEnd = entries.reduce((end, entry) => Math.max(end, entry.responseEnd), 0);
+return performance.now() - lastEnd >= arguments[0];
+"""
+
+# Identifies the search result list currently shown in the frame: its URL and first article link
+LIST_SIGNATURE_SCRIPT = """
+const first = document.querySelector('a[class*="article"]');
+return location.href + '|' + (first ? first.href : '');
+"""
+
+# URL of the document loaded in the cafe_main iframe, or null while it is still loading
+CAFE_FRAME_SCRIPT = """
+const frame = document.querySelector('iframe#cafe_main');
+try {
+    const doc = frame && frame.contentDocument;
+    return doc && doc.readyState === 'complete' ? frame.contentWindow.location.href : null;
+} catch (e) {
+    return null;
+}
+"""
+
+
+def timed_wait(step, driver, condition, timeout=10, poll_frequency=0.1):
+    """
+    WebDriverWait(driver, timeout).until(condition), recording how long it took under step.
+    """
+    start = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+    except TimeoutException:
+        wait_timeouts[step] += 1
+        raise
+    finally:
+        wait_timings[step].append(time.perf_counter() - start)
+
+
+def wait_for_network_idle(driver, step, idle_ms=500, timeout=2):
+    """
+    Waits until the current document has loaded no resource for idle_ms, e.g. after comments are requested.
+
+    Pages that keep polling never go idle, so this gives up after timeout and returns False
+    instead of raising: the caller only uses it to let late content settle.
+    """
+    try:
+        return timed_wait(step, driver, lambda d: d.execute_script(NETWORK_IDLE_SCRIPT, idle_ms), timeout)
+    except TimeoutException:
+        return False
+
+
+def list_signature(driver):
+    return driver.execute_script(LIST_SIGNATURE_SCRIPT)
+
+
+def wait_for_list_change(driver, previous_signature, step, timeout=10):
+    """
+    Waits until the frame shows a fully loaded result list other than the one with previous_signature.
+    """
+    def changed(d):
+        if d.execute_script("return document.readyState;") != "complete":
+            return False
+        signature = list_signature(d)
+        return signature if signature != previous_signature else False
+
+    return timed_wait(step, driver, changed, timeout)
+
+
+def cafe_frame_url(driver):
+    return driver.execute_script(CAFE_FRAME_SCRIPT)
+
+
+def wait_for_cafe_frame(driver, previous_url, step, timeout=10):
+    """
+    Waits until the cafe_main iframe has finished loading a document other than previous_url.
+    """
+    def loaded(d):
+        url = cafe_frame_url(d)
+        return url if url and url != previous_url else False
+
+    return timed_wait(step, driver, loaded, timeout)
+
+
+def wait_for_login(driver, timeout=120):
+    """
+    Waits until the browser has left the login page, which includes any CAPTCHA solved by hand.
+    """
+    return timed_wait("login", driver, lambda d: "nidlogin" not in d.current_url, timeout, poll_frequency=0.5)
+
+
+def wait_summary():
+    """
+    Returns {step: {"waits", "timeouts", "total", "mean", "max", "histogram"}} over every wait so far.
+
+    histogram maps a bucket label ("<=0.5s", ..., ">10s") to the number of waits that fell into it.
+    """
+    summary = {}
+    for step, values in wait_timings.items():
+        if not values:
+            continue
+        labels = [f"<={bound}s" for bound in WAIT_BUCKETS] + [f">{WAIT_BUCKETS[-1]}s"]
+        histogram = dict.fromkeys(labels, 0)
+        for value in values:
+            index = next((i for i, bound in enumerate(WAIT_BUCKETS) if value <= bound), len(WAIT_BUCKETS))
+            histogram[labels[index]] += 1
+        summary[step] = {
+            "waits": len(values),
+            "timeouts": wait_timeouts[step],
+            "total": sum(values),
+            "mean": sum(values) / len(values),
+            "max": max(values),
+            "histogram": histogram,
+        }
+    return summary